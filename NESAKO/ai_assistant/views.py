@@ -28,6 +28,42 @@ from .task_processor import task_processor, create_code_analysis_task, create_fi
 from .nesako_chatbot import NESAKOChatbot
 from .models import LessonLearned
 
+# Oflajn fallback: ključna reč → kategorija saveta (redosled u _FALLBACK_PRIORITY je prioritet)
+_FALLBACK_KEYWORDS = {
+    'kod': 'code', 'program': 'code', 'script': 'code', 'github': 'code',
+    'sport': 'sport', 'utakmica': 'sport', 'rezultat': 'sport', 'liga': 'sport',
+    'vreme': 'weather', 'temperatura': 'weather', 'prognoza': 'weather',
+}
+_FALLBACK_RE = re.compile('|'.join(re.escape(k) for k in sorted(_FALLBACK_KEYWORDS, key=len, reverse=True)))
+_FALLBACK_PRIORITY = ('code', 'sport', 'weather')
+_FALLBACK_ADVICE = {
+    'code': """💡 **SAVETI ZA KOD:**
+- Proverite sintaksu i greške u kodu
+- Koristite debugger za otklanjanje grešaka
+- Testirajte kod u manjim delovima
+- Konsultujte dokumentaciju za jezik/framework
+""",
+    'sport': """⚽ **SPORTSKE INFORMACIJE:**
+- Posetite zvanične sajtove sportskih organizacija
+- Koristite sportske aplikacije za ažurne rezultate
+- Proverite vesti na pouzdanim sportskim portalima
+""",
+    'weather': """🌤️ **VREMENSKA PROGNOZA:**
+- Koristite vebsajtove kao što su accuweather.com ili weather.com
+- Proverite lokalne meteorološke stanice
+""",
+}
+_FALLBACK_HEADER = """🤖 **NESAKO AI - OFLAJN MOD**
+
+⚠️ *Glavni AI servis je trenutno nedostupan, ali evo šta mogu da uradim:*
+"""
+_FALLBACK_FOOTER = """🔧 **REŠAVANJE PROBLEMA:**
+- Pokušajte ponovo za nekoliko minuta
+- Proverite internet konekciju
+- Formulišite pitanje drugačije
+
+🔄 *AI servis će biti ponovo dostupan uskoro*"""
+
 class DeepSeekAPI(View):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1939,58 +1975,25 @@ Da li želite da nastavite? (potrebna je eksplicitna potvrda)"""
         """Generate a comprehensive fallback response when AI services are unavailable"""
         try:
             # Start with a helpful message
-            response_parts = [
-                "🤖 **NESAKO AI - OFLAJN MOD**",
-                "",
-                "⚠️ *Glavni AI servis je trenutno nedostupan, ali evo šta mogu da uradim:*",
-                ""
-            ]
+            response_parts = [_FALLBACK_HEADER]
             
             # Add tools output if available
             if tools_output:
-                response_parts.append("🔧 **REZULTATI ALATA:**")
-                response_parts.append(tools_output)
-                response_parts.append("")
+                response_parts.append(f"🔧 **REZULTATI ALATA:**\n{tools_output}\n")
             
             # Add additional data if available
             if additional_data:
-                response_parts.append("📊 **DODATNE INFORMACIJE:**")
-                response_parts.append(additional_data)
-                response_parts.append("")
-            
-            # Analyze the user input to provide helpful guidance
-            input_lower = user_input.lower()
-            
-            # Provide context-specific help
-            if any(word in input_lower for word in ['kod', 'program', 'script', 'github']):
-                response_parts.append("💡 **SAVETI ZA KOD:**")
-                response_parts.append("- Proverite sintaksu i greške u kodu")
-                response_parts.append("- Koristite debugger za otklanjanje grešaka")
-                response_parts.append("- Testirajte kod u manjim delovima")
-                response_parts.append("- Konsultujte dokumentaciju za jezik/framework")
-                response_parts.append("")
-            
-            elif any(word in input_lower for word in ['sport', 'utakmica', 'rezultat', 'liga']):
-                response_parts.append("⚽ **SPORTSKE INFORMACIJE:**")
-                response_parts.append("- Posetite zvanične sajtove sportskih organizacija")
-                response_parts.append("- Koristite sportske aplikacije za ažurne rezultate")
-                response_parts.append("- Proverite vesti na pouzdanim sportskim portalima")
-                response_parts.append("")
-            
-            elif any(word in input_lower for word in ['vreme', 'temperatura', 'prognoza']):
-                response_parts.append("🌤️ **VREMENSKA PROGNOZA:**")
-                response_parts.append("- Koristite vebsajtove kao što su accuweather.com ili weather.com")
-                response_parts.append("- Proverite lokalne meteorološke stanice")
-                response_parts.append("")
+                response_parts.append(f"📊 **DODATNE INFORMACIJE:**\n{additional_data}\n")
             
-            # Add general troubleshooting
-            response_parts.append("🔧 **REŠAVANJE PROBLEMA:**")
-            response_parts.append("- Pokušajte ponovo za nekoliko minuta")
-            response_parts.append("- Proverite internet konekciju")
-            response_parts.append("- Formulišite pitanje drugačije")
-            response_parts.append("")
+            # Provide context-specific help (jedan prolaz kroz unos, najviše jedan blok saveta)
+            found = {_FALLBACK_KEYWORDS[m] for m in _FALLBACK_RE.findall(user_input.lower())}
+            for category in _FALLBACK_PRIORITY:
+                if category in found:
+                    response_parts.append(_FALLBACK_ADVICE[category])
+                    break
             
-            response_parts.append("🔄 *AI servis će biti ponovo dostupan uskoro*")
+            # Add general troubleshooting
+            response_parts.append(_FALLBACK_FOOTER)
             
             return "\n".join(response_parts)
             
@@ -188,27 +188,46 @@ else:
     SESSION_COOKIE_SECURE = False
     CSRF_COOKIE_SECURE = False
 
+# Logging - produkcija radi na WARNING, lokalno se može podići preko NESAKO_LOG_LEVEL
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'nesako': {
+            'handlers': ['console'],
+            'level': os.getenv('NESAKO_LOG_LEVEL', 'DEBUG' if DEBUG else 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Session settings - jedinstveni naziv
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# cached_db: čitanje sesije iz keša, upis i dalje ide u bazu (stabilan session_key za memoriju razgovora)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 SESSION_COOKIE_NAME = 'nesako_ai_sessionid'
 CSRF_COOKIE_NAME = 'nesako_ai_csrftoken'
 SESSION_COOKIE_AGE = 86400  # 24 hours
 
-# Plugin system loader - optional
+# Plugin system loader - optional (skenira se jednom pri importu settings-a; sa --preload deli se među workerima)
 try:
     import importlib
+    import pkgutil
     plugin_folder = BASE_DIR / 'plugins'
-    PLUGINS = []
+    _plugins = []
     if plugin_folder.exists():
-        for fname in os.listdir(plugin_folder):
-            if fname.endswith('.py') and fname not in ['__init__.py']:
-                mod_name = f"plugins.{fname[:-3]}"
-                try:
-                    mod = importlib.import_module(mod_name)
-                    if hasattr(mod, 'register'):
-                        PLUGINS.append(mod.register)
-                except Exception:
-                    # Do not break startup because of plugin error
-                    pass
+        for _, name, ispkg in pkgutil.iter_modules([str(plugin_folder)]):
+            if ispkg:
+                continue
+            try:
+                mod = importlib.import_module(f"plugins.{name}")
+                if hasattr(mod, 'register'):
+                    _plugins.append(mod.register)
+            except Exception:
+                # Do not break startup because of plugin error
+                pass
+    PLUGINS = tuple(_plugins)
 except Exception:
-    PLUGINS = []
+    PLUGINS = ()
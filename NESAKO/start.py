@@ -29,10 +29,17 @@ def main():
         print("Migration failed, but continuing...")
     
     port = os.environ.get('PORT', '10000')
-    gunicorn_cmd = f"gunicorn main:application --bind 0.0.0.0:{port} --workers 2 --timeout 120"
+    gunicorn_args = [
+        "gunicorn", "main:application",
+        "--bind", f"0.0.0.0:{port}",
+        "--workers", "2",
+        "--timeout", "120",
+    ]
     
     print(f"Starting gunicorn on port {port}...")
-    os.system(gunicorn_cmd)
+    sys.stdout.flush()
+    # Zamenjuje Python proces gunicorn-om (bez dodatnog shell-a i roditeljskog procesa)
+    os.execvp(gunicorn_args[0], gunicorn_args)
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,226 @@
+import functools
+import io
 import os
 import json
 import re
+import string
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+# Regex-i za extract_parameters – kompajliraju se jednom, ne na svaki poziv
+_GIT_CLONE_URL_RE = re.compile(r'https?://(?:github\.com|gitlab\.com)/[\w\-\.]+/[\w\-\.]+')
+_COMMIT_MSG_RES = (
+    re.compile(r'"([^"]+)"'),  # Tekst u navodnicima
+    re.compile(r"'([^']+)'"),  # Tekst u apostrofima
+)
+_BRANCH_RE = re.compile(r'(?:branch|grana)\s+(\w+)')
+_ROLLBACK_STEPS_RE = re.compile(r'(\d+)\s*(?:korak|step|commit)')
+_NPM_PKG_RES = (
+    re.compile(r'(?:package|paket)\s+(\S+)'),
+    re.compile(r'(?:install|instaliraj)\s+(\S+)'),
+    re.compile(r'npm\s+install\s+(\S+)'),
+)
+_PY_PKG_RE = re.compile(r'(?:pip install|instaliraj)\s+(\S+)')
+_PY_VENV_RE = re.compile(r'(?:venv|environment)\s+(\w+)')
+_PY_RUN_RE = re.compile(r'(?:run|pokreni)\s+(\S+\.py)')
+_FOLDER_RES = (
+    re.compile(r'(?:folder|direktorijum)\s+"([^"]+)"'),
+    re.compile(r'(?:folder|direktorijum)\s+(\S+)'),
+    re.compile(r'mkdir\s+"([^"]+)"'),
+    re.compile(r'mkdir\s+(\S+)'),
+)
+
+
+# Ključne reči za detect_command_intent: (tip, pouzdanost, {komanda: okidači}); redosled = redosled rezultata
+_COMMAND_INTENT_TABLE = (
+    ('git', 0.8, {
+        'clone': ('clone', 'kloniraj', 'preuzmi repo'),
+        'init': ('git init', 'inicijalizuj git', 'napravi git'),
+        'commit': ('commit', 'commituj', 'sačuvaj izmene'),
+        'push': ('push', 'pošalji', 'upload'),
+        'pull': ('pull', 'povuci', 'ažuriraj'),
+        'status': ('status', 'stanje', 'šta je novo'),
+        'add': ('add', 'dodaj', 'stage'),
+        'rollback': ('rollback', 'vrati', 'poništi', 'reset'),
+    }),
+    ('npm', 0.8, {
+        'install': ('npm install', 'instaliraj paket', 'dodaj dependency'),
+        'start': ('npm start', 'pokreni app', 'startuj'),
+        'build': ('npm build', 'build app', 'kompajliraj'),
+        'init': ('npm init', 'inicijalizuj npm', 'napravi package.json'),
+    }),
+    ('python', 0.8, {
+        'install': ('pip install', 'instaliraj python paket'),
+        'run': ('python run', 'pokreni python', 'izvršava python'),
+        'venv': ('virtual environment', 'venv', 'virtuelno okruženje'),
+        'django': ('django', 'runserver', 'migrate'),
+    }),
+    ('file_operation', 0.7, {
+        'create_folder': ('napravi folder', 'kreiraj direktorijum', 'mkdir'),
+        'copy': ('kopiraj', 'copy', 'dupliraj'),
+        'move': ('premesti', 'move', 'mv'),
+        'delete': ('obriši', 'delete', 'ukloni'),
+    }),
+)
+_COMMAND_INTENTS = tuple(
+    (cmd_type, command, confidence)
+    for cmd_type, confidence, commands in _COMMAND_INTENT_TABLE
+    for command in commands
+)
+
+
+def _build_intent_scanner(table):
+    """Regex sa lookahead-om nalazi okidač na svakoj poziciji (i preklapanja, kao `kw in text`).
+    Na istoj poziciji pobeđuje najduži okidač, pa mu se pripisuju i oznake svih okidača koji su mu prefiks."""
+    labels_by_kw = {}
+    for cmd_type, _, commands in table:
+        for command, kws in commands.items():
+            for kw in kws:
+                labels_by_kw.setdefault(kw, set()).add((cmd_type, command))
+    expanded = {
+        kw: frozenset().union(*(labels for other, labels in labels_by_kw.items() if kw.startswith(other)))
+        for kw in labels_by_kw
+    }
+    alternation = '|'.join(re.escape(k) for k in sorted(labels_by_kw, key=len, reverse=True))
+    return re.compile(f'(?=({alternation}))'), expanded
+
+
+_COMMAND_INTENT_RE, _COMMAND_INTENT_LABELS = _build_intent_scanner(_COMMAND_INTENT_TABLE)
+
+# Prikaz komandi: ikonice po shell-u i fiksne napomene na kraju
+_SHELL_ICONS = {
+    'cmd': '🖥️ CMD:',
+    'powershell': '💙 PowerShell:',
+    'bash': '🐧 Git Bash:',
+    'all': '⚡ Komanda:'
+}
+_DEFAULT_SHELL_ICON = '📝'
+_COMMANDS_FOOTER = "\n".join((
+    "💡 **NAPOMENE:**",
+    "- Komande su spremne za copy/paste",
+    "- Zamenite `<parametar>` sa stvarnim vrednostima",
+    "- Proverite putanje pre izvršavanja",
+    "- Za Git komande, budite u Git repozitorijumu",
+))
+
+
+@functools.lru_cache(maxsize=512)
+def _detect_intents(input_lower: str) -> Tuple:
+    """Jedan prolaz regex-om kroz ulaz umesto any(pattern in input_lower ...) po svakoj komandi.
+    Keširano po ulazu (ponovljeni upiti); vraća nepromenljiv tuple (tip, komanda, pouzdanost)."""
+    # hits je skup (tip, komanda): više sinonima iste komande ("push pošalji") daje jedan pogodak,
+    # a _COMMAND_INTENTS sadrži svaki par tačno jednom – generate_commands ne formatira duplikate
+    hits = set()
+    for m in _COMMAND_INTENT_RE.finditer(input_lower):
+        hits |= _COMMAND_INTENT_LABELS[m.group(1)]
+    return tuple(intent for intent in _COMMAND_INTENTS if intent[:2] in hits)
+
+
+@functools.lru_cache(maxsize=512)
+def _extract_parameters(user_input: str, command_type: str, command: str, desktop_path: str, input_lower: str) -> Tuple:
+    """Čista funkcija iza CommandGenerator.extract_parameters – keširana po ulazu; vraća tuple parova."""
+    params = {}
+
+    # Git parametri
+    if command_type == 'git':
+        if command == 'clone':
+            # Traži GitHub/GitLab URL – literalni prefilter (str.find u C-u), regex samo kad host postoji u tekstu
+            match = None
+            if 'github.com/' in user_input or 'gitlab.com/' in user_input:
+                match = _GIT_CLONE_URL_RE.search(user_input)
+            if match:
+                params['repo_url'] = match.group()
+
+        elif command == 'commit':
+            # Traži commit message
+            for pattern in _COMMIT_MSG_RES:
+                match = pattern.search(user_input)
+                if match:
+                    params['message'] = match.group(1)
+                    break
+            if 'message' not in params:
+                params['message'] = 'Update code'
+
+        elif command == 'push' or command == 'pull':
+            params['remote'] = 'origin'
+            params['branch'] = 'main'
+            # Traži branch name
+            match = _BRANCH_RE.search(input_lower)
+            if match:
+                params['branch'] = match.group(1)
+
+        elif command == 'rollback':
+            # Traži broj koraka
+            match = _ROLLBACK_STEPS_RE.search(input_lower)
+            if match:
+                params['steps'] = match.group(1)
+            else:
+                params['steps'] = '1'
+
+    # NPM parametri
+    elif command_type == 'npm':
+        if command in ['install', 'uninstall', 'update']:
+            # Traži package name
+            for pattern in _NPM_PKG_RES:
+                match = pattern.search(input_lower)
+                if match:
+                    params['package'] = match.group(1)
+                    break
+
+    # Python parametri
+    elif command_type == 'python':
+        if command == 'install':
+            # Traži package name
+            match = _PY_PKG_RE.search(input_lower)
+            if match:
+                params['package'] = match.group(1)
+
+        elif command == 'venv':
+            # Traži env name
+            match = _PY_VENV_RE.search(input_lower)
+            if match:
+                params['env_name'] = match.group(1)
+            else:
+                params['env_name'] = 'venv'
+
+        elif command == 'run':
+            # Traži file name
+            match = _PY_RUN_RE.search(user_input)
+            if match:
+                params['file'] = match.group(1)
+
+    # File operation parametri
+    elif command_type == 'file_operation':
+        if command == 'create_folder':
+            # Traži folder name/path
+            for pattern in _FOLDER_RES:
+                match = pattern.search(user_input)
+                if match:
+                    folder_name = match.group(1)
+                    # Ako je relativna putanja, dodaj desktop
+                    if not os.path.isabs(folder_name):
+                        params['path'] = os.path.join(desktop_path, folder_name)
+                    else:
+                        params['path'] = folder_name
+                    break
+
+    return tuple(params.items())
+
+
+
+@functools.lru_cache(maxsize=None)
+def _template_fields(template: str) -> Tuple[str, ...]:
+    """Imena polja u šablonu komande (redom, bez duplikata) – računa se jednom po šablonu."""
+    return tuple(dict.fromkeys(name for _, name, _, _ in string.Formatter().parse(template) if name))
+
+
+def _fill_placeholders(template: str, params: Dict) -> List[str]:
+    """Dopunjuje params sa '<polje>' za svako polje koje nedostaje; vraća listu dopunjenih polja."""
+    missing = [name for name in _template_fields(template) if name not in params]
+    for name in missing:
+        params[name] = f'<{name}>'
+    return missing
+
 class CommandGenerator:
     """Napredni generator komandi za Git Bash, CMD i PowerShell"""
     
@@ -99,83 +316,15 @@ class CommandGenerator:
         
         self.desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
     
-    def detect_command_intent(self, user_input: str) -> Dict:
+    def detect_command_intent(self, user_input: str, input_lower: Optional[str] = None) -> Dict:
         """Detektuje nameru korisnika za komande"""
-        input_lower = user_input.lower()
+        if input_lower is None:
+            input_lower = user_input.lower()
         
-        # Git komande
-        git_patterns = {
-            'clone': ['clone', 'kloniraj', 'preuzmi repo'],
-            'init': ['git init', 'inicijalizuj git', 'napravi git'],
-            'commit': ['commit', 'commituj', 'sačuvaj izmene'],
-            'push': ['push', 'pošalji', 'upload'],
-            'pull': ['pull', 'povuci', 'ažuriraj'],
-            'status': ['status', 'stanje', 'šta je novo'],
-            'add': ['add', 'dodaj', 'stage'],
-            'rollback': ['rollback', 'vrati', 'poništi', 'reset']
-        }
-        
-        # NPM/Node komande
-        npm_patterns = {
-            'install': ['npm install', 'instaliraj paket', 'dodaj dependency'],
-            'start': ['npm start', 'pokreni app', 'startuj'],
-            'build': ['npm build', 'build app', 'kompajliraj'],
-            'init': ['npm init', 'inicijalizuj npm', 'napravi package.json']
-        }
-        
-        # Python komande
-        python_patterns = {
-            'install': ['pip install', 'instaliraj python paket'],
-            'run': ['python run', 'pokreni python', 'izvršava python'],
-            'venv': ['virtual environment', 'venv', 'virtuelno okruženje'],
-            'django': ['django', 'runserver', 'migrate']
-        }
-        
-        # File operations
-        file_patterns = {
-            'create_folder': ['napravi folder', 'kreiraj direktorijum', 'mkdir'],
-            'copy': ['kopiraj', 'copy', 'dupliraj'],
-            'move': ['premesti', 'move', 'mv'],
-            'delete': ['obriši', 'delete', 'ukloni']
-        }
-        
-        detected_commands = []
-        
-        # Proveri Git komande
-        for command, patterns in git_patterns.items():
-            if any(pattern in input_lower for pattern in patterns):
-                detected_commands.append({
-                    'type': 'git',
-                    'command': command,
-                    'confidence': 0.8
-                })
-        
-        # Proveri NPM komande
-        for command, patterns in npm_patterns.items():
-            if any(pattern in input_lower for pattern in patterns):
-                detected_commands.append({
-                    'type': 'npm',
-                    'command': command,
-                    'confidence': 0.8
-                })
-        
-        # Proveri Python komande
-        for command, patterns in python_patterns.items():
-            if any(pattern in input_lower for pattern in patterns):
-                detected_commands.append({
-                    'type': 'python',
-                    'command': command,
-                    'confidence': 0.8
-                })
-        
-        # Proveri File operations
-        for command, patterns in file_patterns.items():
-            if any(pattern in input_lower for pattern in patterns):
-                detected_commands.append({
-                    'type': 'file_operation',
-                    'command': command,
-                    'confidence': 0.7
-                })
+        detected_commands = [
+            {'type': cmd_type, 'command': command, 'confidence': confidence}
+            for cmd_type, command, confidence in _detect_intents(input_lower)
+        ]
         
         return {
             'detected_commands': detected_commands,
@@ -183,118 +332,18 @@ class CommandGenerator:
             'primary_type': detected_commands[0]['type'] if detected_commands else None
         }
     
-    def extract_parameters(self, user_input: str, command_type: str, command: str) -> Dict:
+    def extract_parameters(self, user_input: str, command_type: str, command: str,
+                           input_lower: Optional[str] = None) -> Dict:
         """Izvlači parametre iz korisničkog unosa"""
-        params = {}
-        input_lower = user_input.lower()
-        
-        # Git parametri
-        if command_type == 'git':
-            if command == 'clone':
-                # Traži GitHub/GitLab URL
-                url_pattern = r'https?://(?:github\.com|gitlab\.com)/[\w\-\.]+/[\w\-\.]+'
-                match = re.search(url_pattern, user_input)
-                if match:
-                    params['repo_url'] = match.group()
-                
-            elif command == 'commit':
-                # Traži commit message
-                message_patterns = [
-                    r'"([^"]+)"',  # Tekst u navodnicima
-                    r"'([^']+)'",  # Tekst u apostrofima
-                ]
-                for pattern in message_patterns:
-                    match = re.search(pattern, user_input)
-                    if match:
-                        params['message'] = match.group(1)
-                        break
-                if 'message' not in params:
-                    params['message'] = 'Update code'
-            
-            elif command == 'push' or command == 'pull':
-                params['remote'] = 'origin'
-                params['branch'] = 'main'
-                # Traži branch name
-                branch_pattern = r'(?:branch|grana)\s+(\w+)'
-                match = re.search(branch_pattern, input_lower)
-                if match:
-                    params['branch'] = match.group(1)
-            
-            elif command == 'rollback':
-                # Traži broj koraka
-                steps_pattern = r'(\d+)\s*(?:korak|step|commit)'
-                match = re.search(steps_pattern, input_lower)
-                if match:
-                    params['steps'] = match.group(1)
-                else:
-                    params['steps'] = '1'
-        
-        # NPM parametri
-        elif command_type == 'npm':
-            if command in ['install', 'uninstall', 'update']:
-                # Traži package name
-                package_patterns = [
-                    r'(?:package|paket)\s+(\S+)',
-                    r'(?:install|instaliraj)\s+(\S+)',
-                    r'npm\s+install\s+(\S+)'
-                ]
-                for pattern in package_patterns:
-                    match = re.search(pattern, input_lower)
-                    if match:
-                        params['package'] = match.group(1)
-                        break
-        
-        # Python parametri
-        elif command_type == 'python':
-            if command == 'install':
-                # Traži package name
-                package_pattern = r'(?:pip install|instaliraj)\s+(\S+)'
-                match = re.search(package_pattern, input_lower)
-                if match:
-                    params['package'] = match.group(1)
-            
-            elif command == 'venv':
-                # Traži env name
-                env_pattern = r'(?:venv|environment)\s+(\w+)'
-                match = re.search(env_pattern, input_lower)
-                if match:
-                    params['env_name'] = match.group(1)
-                else:
-                    params['env_name'] = 'venv'
-            
-            elif command == 'run':
-                # Traži file name
-                file_pattern = r'(?:run|pokreni)\s+(\S+\.py)'
-                match = re.search(file_pattern, user_input)
-                if match:
-                    params['file'] = match.group(1)
-        
-        # File operation parametri
-        elif command_type == 'file_operation':
-            if command == 'create_folder':
-                # Traži folder name/path
-                folder_patterns = [
-                    r'(?:folder|direktorijum)\s+"([^"]+)"',
-                    r'(?:folder|direktorijum)\s+(\S+)',
-                    r'mkdir\s+"([^"]+)"',
-                    r'mkdir\s+(\S+)'
-                ]
-                for pattern in folder_patterns:
-                    match = re.search(pattern, user_input)
-                    if match:
-                        folder_name = match.group(1)
-                        # Ako je relativna putanja, dodaj desktop
-                        if not os.path.isabs(folder_name):
-                            params['path'] = os.path.join(self.desktop_path, folder_name)
-                        else:
-                            params['path'] = folder_name
-                        break
-        
-        return params
+        if input_lower is None:
+            input_lower = user_input.lower()
+        return dict(_extract_parameters(user_input, command_type, command, self.desktop_path, input_lower))
     
     def generate_commands(self, user_input: str) -> Dict:
         """Generiše komande na osnovu korisničkog unosa"""
-        intent = self.detect_command_intent(user_input)
+        # Lowercase jednom za detekciju i sve ekstrakcije parametara
+        input_lower = user_input.lower()
+        intent = self.detect_command_intent(user_input, input_lower)
         
         if not intent['has_commands']:
             return {
@@ -309,7 +358,7 @@ class CommandGenerator:
             command = detected['command']
             
             # Izvuci parametre
-            params = self.extract_parameters(user_input, command_type, command)
+            params = self.extract_parameters(user_input, command_type, command, input_lower)
             
             # Generiši komande za različite shell-ove
             if command_type == 'file_operation':
@@ -319,23 +368,16 @@ class CommandGenerator:
                     
                     cmd_commands = []
                     for shell, template in templates.items():
-                        try:
-                            formatted_command = template.format(**params)
-                            cmd_commands.append({
-                                'shell': shell,
-                                'command': formatted_command,
-                                'description': f'{command} - {shell}'
-                            })
-                        except KeyError as e:
-                            # Ako nema dovoljno parametara, dodaj placeholder
-                            missing_param = str(e).strip("'")
-                            params[missing_param] = f'<{missing_param}>'
-                            formatted_command = template.format(**params)
-                            cmd_commands.append({
-                                'shell': shell,
-                                'command': formatted_command,
-                                'description': f'{command} - {shell} (potrebno dopuniti {missing_param})'
-                            })
+                        # Ako nema dovoljno parametara, dodaj placeholder (bez KeyError putanje)
+                        missing = _fill_placeholders(template, params)
+                        description = f'{command} - {shell}'
+                        if missing:
+                            description += f' (potrebno dopuniti {", ".join(missing)})'
+                        cmd_commands.append({
+                            'shell': shell,
+                            'command': template.format(**params),
+                            'description': description
+                        })
                     
                     generated_commands.append({
                         'type': command_type,
@@ -348,36 +390,22 @@ class CommandGenerator:
                 if command_type in self.command_templates and command in self.command_templates[command_type]:
                     template = self.command_templates[command_type][command]
                     
-                    try:
-                        formatted_command = template.format(**params)
-                        description = f'{command_type.upper()} - {command}'
-                        
-                        generated_commands.append({
-                            'type': command_type,
-                            'command': command,
-                            'commands': [{
-                                'shell': 'all',
-                                'command': formatted_command,
-                                'description': description
-                            }],
-                            'parameters': params
-                        })
-                    except KeyError as e:
-                        # Ako nema dovoljno parametara
-                        missing_param = str(e).strip("'")
-                        params[missing_param] = f'<{missing_param}>'
-                        formatted_command = template.format(**params)
-                        
-                        generated_commands.append({
-                            'type': command_type,
-                            'command': command,
-                            'commands': [{
-                                'shell': 'all',
-                                'command': formatted_command,
-                                'description': f'{command_type.upper()} - {command} (potrebno dopuniti {missing_param})'
-                            }],
-                            'parameters': params
-                        })
+                    # Ako nema dovoljno parametara, dodaj placeholder
+                    missing = _fill_placeholders(template, params)
+                    description = f'{command_type.upper()} - {command}'
+                    if missing:
+                        description += f' (potrebno dopuniti {", ".join(missing)})'
+                    
+                    generated_commands.append({
+                        'type': command_type,
+                        'command': command,
+                        'commands': [{
+                            'shell': 'all',
+                            'command': template.format(**params),
+                            'description': description
+                        }],
+                        'parameters': params
+                    })
         
         return {
             'success': True,
@@ -391,43 +419,30 @@ class CommandGenerator:
         if not commands_result['success']:
             return commands_result['message']
         
-        output = []
-        output.append("🔧 **GENERIRANE KOMANDE - COPY/PASTE SPREMNE:**\n")
+        buf = io.StringIO()
+        w = buf.write
+        w("🔧 **GENERIRANE KOMANDE - COPY/PASTE SPREMNE:**\n\n")
         
+        icon_for = _SHELL_ICONS.get
         for i, cmd_group in enumerate(commands_result['commands'], 1):
-            output.append(f"**{i}. {cmd_group['type'].upper()} - {cmd_group['command']}**")
+            w(f"**{i}. {cmd_group['type'].upper()} - {cmd_group['command']}**\n")
             
             for cmd in cmd_group['commands']:
-                shell_icon = {
-                    'cmd': '🖥️ CMD:',
-                    'powershell': '💙 PowerShell:',
-                    'bash': '🐧 Git Bash:',
-                    'all': '⚡ Komanda:'
-                }.get(cmd['shell'], '📝')
-                
-                output.append(f"{shell_icon}")
-                output.append(f"```")
-                output.append(cmd['command'])
-                output.append(f"```")
-                
+                shell_icon = icon_for(cmd['shell'], _DEFAULT_SHELL_ICON)
+                w(f"{shell_icon}\n```\n{cmd['command']}\n```\n")
                 if cmd['description']:
-                    output.append(f"*{cmd['description']}*")
-                output.append("")
+                    w(f"*{cmd['description']}*\n")
+                w("\n")
             
             # Prikaži parametre ako postoje
             if cmd_group['parameters']:
-                output.append("**Parametri:**")
+                w("**Parametri:**\n")
                 for param, value in cmd_group['parameters'].items():
-                    output.append(f"- {param}: `{value}`")
-                output.append("")
+                    w(f"- {param}: `{value}`\n")
+                w("\n")
         
-        output.append("💡 **NAPOMENE:**")
-        output.append("- Komande su spremne za copy/paste")
-        output.append("- Zamenite `<parametar>` sa stvarnim vrednostima")
-        output.append("- Proverite putanje pre izvršavanja")
-        output.append("- Za Git komande, budite u Git repozitorijumu")
-        
-        return "\n".join(output)
+        w(_COMMANDS_FOOTER)
+        return buf.getvalue()
     
     def create_batch_file(self, commands: List[str], filename: str = None) -> str:
         """Kreira .bat fajl sa komandama"""
@@ -438,22 +453,26 @@ class CommandGenerator:
         batch_path = os.path.join(self.desktop_path, filename)
         
         try:
+            # Ceo sadržaj se sklapa u memoriji i upisuje jednim write-om
+            lines = [
+                "@echo off\n",
+                "echo NESAKO AI - Generated Commands\n",
+                "echo ================================\n",
+                "pause\n\n",
+            ]
+            for i, command in enumerate(commands, 1):
+                lines.append(
+                    f"echo Executing command {i}: {command}\n"
+                    f"{command}\n"
+                    "if %errorlevel% neq 0 (\n"
+                    f"    echo Error executing command {i}\n"
+                    "    pause\n"
+                    ")\n\n"
+                )
+            lines.append("echo All commands completed!\npause\n")
+            
             with open(batch_path, 'w', encoding='utf-8') as f:
-                f.write("@echo off\n")
-                f.write("echo NESAKO AI - Generated Commands\n")
-                f.write("echo ================================\n")
-                f.write("pause\n\n")
-                
-                for i, command in enumerate(commands, 1):
-                    f.write(f"echo Executing command {i}: {command}\n")
-                    f.write(f"{command}\n")
-                    f.write("if %errorlevel% neq 0 (\n")
-                    f.write(f"    echo Error executing command {i}\n")
-                    f.write("    pause\n")
-                    f.write(")\n\n")
-                
-                f.write("echo All commands completed!\n")
-                f.write("pause\n")
+                f.write("".join(lines))
             
             return f"✅ Batch fajl kreiran: {batch_path}"
             
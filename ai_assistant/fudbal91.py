@@ -1,8 +1,18 @@
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+import os
 import re
-from typing import List, Dict, Optional
+import sqlite3
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Dict, Optional, Tuple
 
 UA = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
@@ -10,100 +20,395 @@ UA = {
 
 DEFAULT_TIMEOUT = 12
 WINDOW_HOURS = 82
+FETCH_WORKERS = 8
+# Najviše vrednosti kvota po bloku u fetch_odds_changes (patološki blokovi sa desetinama brojeva)
+ODDS_VALUES_MAX = 20
+
+try:
+    import lxml  # noqa: F401  – C parser, višestruko brži od html.parser
+    _PARSER = "lxml"
+except ImportError:
+    _PARSER = "html.parser"
+
+# Keš stranica: (url, strainer) -> (fetch_ts, etag, last_modified, soup); posle TTL-a conditional GET (304 = keš)
+# LRU redosled (OrderedDict): pogodak ide na kraj, pri prelivanju izbacuje se najstariji – O(1)
+SOUP_CACHE_TTL = 60
+SOUP_CACHE_MAX = 32
+_HTTP_CACHE: "OrderedDict[Tuple[str, object], Tuple[float, Optional[str], Optional[str], BeautifulSoup]]" = OrderedDict()
+
+# Trajni (SQLite) keš HTML-a između restarta procesa; FUDBAL91_CACHE_MODE:
+#   disabled (podrazumevano) – samo memorijski keš, enabled – čita/piše disk, replay – samo disk, bez mreže
+FUDBAL91_CACHE_MODE = os.environ.get("FUDBAL91_CACHE_MODE", "disabled").strip().lower()
+FUDBAL91_CACHE_PATH = os.environ.get(
+    "FUDBAL91_CACHE_PATH", os.path.join(tempfile.gettempdir(), "fudbal91_cache.sqlite3")
+)
+_DISK: Optional[sqlite3.Connection] = None
+_DISK_LOCK = threading.Lock()
+
+# Parsira se samo <body> (preskače <head> sa skriptama/stilovima); svi selektori ispod gađaju body
+BODY_ONLY = SoupStrainer("body")
+
+_SESSION: Optional[requests.Session] = None
+# fetch_all radi iz više niti – kreiranje Session-a i upis/izbacivanje iz keša idu pod lock
+_LOCK = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Deljena Session (keep-alive/TLS reuse) za sve fudbal91 zahteve, sa retry-jem na 429/5xx."""
+    global _SESSION
+    if _SESSION is None:
+        with _LOCK:
+            if _SESSION is None:
+                from urllib3.util.retry import Retry
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=FETCH_WORKERS,
+                    pool_maxsize=FETCH_WORKERS,
+                    pool_block=True,
+                    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(UA)
+                _SESSION = session
+    return _SESSION
+
+class _TokenBucket:
+    """Token bucket za odlazne zahteve: do `capacity` zahteva odjednom, zatim `rate_per_min` u minutu.
+    Token se rezerviše pod lock-om, a čeka se van njega – niti iz fetch_all ne blokiraju jedna drugu.
+    Čekanje je ograničeno na `max_wait` sekundi (web zahtev ne sme da visi do gunicorn timeout-a):
+    ako bi trebalo čekati duže, acquire() vraća False i ništa ne rezerviše."""
+
+    def __init__(self, rate_per_min: float, capacity: int, max_wait: float = 5.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        if rate_per_min <= 0:
+            raise ValueError("rate_per_min must be > 0")
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(capacity)
+        self.max_wait = max_wait
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            if wait > self.max_wait:
+                return False
+            self._tokens -= 1
+        if wait > 0:
+            self._sleep(wait)
+        return True
+
+
+def _positive_env(name: str, default: float) -> float:
+    try:
+        value = float(os.environ.get(name, default))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+_BUCKET = _TokenBucket(
+    rate_per_min=_positive_env("FUDBAL91_RATE_PER_MIN", 30),
+    capacity=max(1, int(_positive_env("FUDBAL91_RATE_BURST", 5))),
+    max_wait=_positive_env("FUDBAL91_RATE_MAX_WAIT", 5),
+)
+
+# Regex-i se kompajliraju jednom – koriste se za svaki red tabele
+# Common formats: 2025-09-27 19:45, 27.09.2025 19:45, 27/09/2025 19:45, 2025-09-27T19:45Z
+# (regex, day_first): day_first=False → grupe 'YYYY-MM-DD', 'HH:MM'; True → dd, mm, yyyy, opciono 'HH:MM'
+_KICKOFF_PATTERNS = (
+    (re.compile(r"(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2})"), False),
+    (re.compile(r"(\d{2})[./](\d{2})[./](\d{4}).?(\d{2}:\d{2})?"), True),
+    (re.compile(r"(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2})Z"), False),
+)
+_TEAMS_RE = re.compile(r"([\w .'-]+)\s*[-–]\s*([\w .'-]+)")
+_ODDS_TOKEN_RE = re.compile(r"\b\d+\.\d+\b")
+_FLOAT_RE = re.compile(r"\d+\.\d+")
+# Oznake tržišta redom kojim se upisuju u odds
+_ODDS_LABELS = ("1", "X", "2", "1X", "12", "X2", "O2.5", "U2.5")
+# Sve oznake u jednoj alternaciji (duže prve): jedan finditer po ćeliji nalazi isti skup oznaka kao
+# zasebni \b<oznaka>\b search-evi – oznake su tokeni ograničeni \b pa se pogoci ne preklapaju
+_ODDS_LABEL_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(lab) for lab in sorted(_ODDS_LABELS, key=len, reverse=True)) + r")\b"
+)
+# CSS selektori kompajlirani jednom (soupsieve) – primenjuju se na svaki red
+_QUICK_ROWS_SEL = sv.compile("table tr, .match, .row, .match-row, .fixture-row, .event-row, .game, .fixture")
+_CHANGE_BLOCKS_SEL = sv.compile(".change, .odds-change, table tr, .row, .event-row")
+_COMPETITION_ROWS_SEL = sv.compile("table tr, .match, .fixture, .game, .match-row, .fixture-row, .event-row, .row")
+_COMPETITION_TITLE_SEL = sv.compile("h1, .competition-title, .title, header h1, .page-title")
+# Selektori unutar reda su samo klase/tag – umesto CSS mašinerije idu na bs4 find sa klasama (brža putanja),
+# isti rezultat: prvi pogodak u redosledu dokumenta.
+# Liga: redosled je prioritet (prvi pogodak pobeđuje), ne redosled u dokumentu
+_LEAGUE_CLASSES = ("league", "comp", "competition")
+_HOME_CLASSES = ("home", "team-home", "home-team", "team1")
+_AWAY_CLASSES = ("away", "team-away", "away-team", "team2")
+_TEAMS_CLASSES = ("teams", "match-name", "teams-wrap")
+_TIME_CLASSES = frozenset(("kickoff", "ko", "date", "time"))
+
+
+def _first_by_class(row, classes: Tuple[str, ...]):
+    """Prvi element po prioritetu klasa (ne po redosledu u dokumentu)."""
+    for cls in classes:
+        el = row.find(class_=cls)
+        if el is not None:
+            return el
+    return None
+
+
+def _is_time_el(tag) -> bool:
+    """Ekvivalent selektora 'time, .kickoff, .ko, .date, .time'."""
+    return tag.name == "time" or not _TIME_CLASSES.isdisjoint(tag.get("class") or ())
 
 
 def _parse_kickoff(text: str) -> Optional[datetime]:
     if not text:
         return None
     text = text.strip()
-    # Try common formats: 2025-09-27 19:45, 27.09.2025 19:45, 27/09/2025 19:45, 2025-09-27T19:45Z
-    patterns = [
-        (r"(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2})", "%Y-%m-%d %H:%M"),
-        (r"(\d{2})[./](\d{2})[./](\d{4}).?(\d{2}:\d{2})?", None),
-        (r"(\d{4}-\d{2}-\d{2})T(\d{2}:\d{2})Z", "%Y-%m-%d %H:%M"),
-    ]
-    for pat, fmt in patterns:
-        m = re.search(pat, text)
+    # Jeftin prefilter pre regex-a: najkraći format je 'dd.mm.yyyy' (10 znakova); ISO formati traže '-' i ':',
+    # a dd.mm.yyyy varijanta '.' ili '/' (vreme je tu opciono)
+    if len(text) < 10 or not (('-' in text and ':' in text) or '.' in text or '/' in text):
+        return None
+    for pat, day_first in _KICKOFF_PATTERNS:
+        m = pat.search(text)
         if m:
+            # Regex garantuje cifre na fiksnim pozicijama – int() umesto sporog strptime;
+            # datetime() i dalje odbija nevalidne datume/sate (ValueError → sledeći obrazac)
             try:
-                if fmt:
-                    dt = datetime.strptime(f"{m.group(1)} {m.group(2)}", fmt)
-                    return dt.replace(tzinfo=timezone.utc)
-                else:
+                if day_first:
                     # dd.mm.yyyy HH:MM
                     day, mon, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
                     hhmm = m.group(4) or "00:00"
-                    dt = datetime.strptime(f"{year:04d}-{mon:02d}-{day:02d} {hhmm}", "%Y-%m-%d %H:%M")
-                    return dt.replace(tzinfo=timezone.utc)
-            except Exception:
+                else:
+                    ymd, hhmm = m.group(1), m.group(2)
+                    year, mon, day = int(ymd[:4]), int(ymd[5:7]), int(ymd[8:10])
+                return datetime(year, mon, day, int(hhmm[:2]), int(hhmm[3:5]), tzinfo=timezone.utc)
+            except ValueError:
                 continue
     return None
 
 
-def _within_window(dt: Optional[datetime], hours: Optional[int] = WINDOW_HOURS) -> bool:
-    if not dt:
-        return False
+def _matches_per_segment(regex: "re.Pattern", texts: List[str], limit: Optional[int] = None) -> List[List[str]]:
+    """Jedan finditer preko svih tekstova spojenih separatorom (\\x1e); pogoci se vraćaju po segmentu.
+    Separator nije cifra ni slovo, pa se granice ponašaju kao početak/kraj stringa.
+    limit: najviše toliko pogodaka po segmentu (višak se preskače bez alokacije)."""
+    out: List[List[str]] = [[] for _ in texts]
+    if not texts:
+        return out
+    starts = list(accumulate((len(t) + 1 for t in texts[:-1]), initial=0))
+    for m in regex.finditer("\x1e".join(texts)):
+        seg = out[bisect_right(starts, m.start()) - 1]
+        if limit is None or len(seg) < limit:
+            seg.append(m.group())
+    return out
+
+
+def _window_bounds(hours: Optional[int] = WINDOW_HOURS) -> Optional[Tuple[datetime, datetime]]:
+    """(sada, sada + hours) – računa se jednom po fetch-u; None znači bez vremenskog ograničenja."""
     if hours is None:
-        return True
+        return None
     now = datetime.now(timezone.utc)
-    return now <= dt <= now + timedelta(hours=hours)
+    return now, now + timedelta(hours=hours)
+
+
+def _within_window(dt: Optional[datetime], bounds: Optional[Tuple[datetime, datetime]]) -> bool:
+    # Granice i kickoff dele isti tzinfo (timezone.utc singleton), pa CPython poredi datetime-ove direktno
+    # po poljima, bez UTC konverzije – brže od .timestamp() po redu
+    if dt is None:
+        return False
+    if bounds is None:
+        return True
+    return bounds[0] <= dt <= bounds[1]
 
 
-def _get_soup(url: str) -> Optional[BeautifulSoup]:
+BASE_URL = "https://www.fudbal91.com/"
+
+
+def _cache_put(key: Tuple[str, object], entry: Tuple[float, Optional[str], Optional[str], BeautifulSoup]) -> None:
+    with _LOCK:
+        _HTTP_CACHE[key] = entry
+        _HTTP_CACHE.move_to_end(key)
+        while len(_HTTP_CACHE) > SOUP_CACHE_MAX:
+            _HTTP_CACHE.popitem(last=False)
+
+
+def _disk_conn() -> sqlite3.Connection:
+    # Poziva se pod _DISK_LOCK
+    global _DISK
+    if _DISK is None:
+        conn = sqlite3.connect(FUDBAL91_CACHE_PATH, timeout=5, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, fetched REAL, etag TEXT, last_modified TEXT, html TEXT)"
+        )
+        _DISK = conn
+    return _DISK
+
+
+def _disk_get(url: str) -> Optional[Tuple[float, Optional[str], Optional[str], str]]:
+    try:
+        with _DISK_LOCK:
+            return _disk_conn().execute(
+                "SELECT fetched, etag, last_modified, html FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+    except Exception:
+        return None
+
+
+def _disk_put(url: str, fetched: float, etag: Optional[str], last_modified: Optional[str], html: str) -> None:
     try:
-        r = requests.get(url, headers=UA, timeout=DEFAULT_TIMEOUT)
+        with _DISK_LOCK:
+            conn = _disk_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, fetched, etag, last_modified, html) VALUES (?, ?, ?, ?, ?)",
+                (url, fetched, etag, last_modified, html),
+            )
+            conn.commit()
+    except Exception:
+        pass
+
+
+def _get_soup(url: str, strainer: Optional[SoupStrainer] = BODY_ONLY, nocache: bool = False) -> Optional[BeautifulSoup]:
+    """nocache=True preskače TTL pogotke (memorija i disk) – stranica se uvek proverava na mreži;
+    sačuvani ETag/Last-Modified i dalje važe (304 = stranica nije menjana). U replay režimu se ignoriše."""
+    key = (url, strainer)
+    now = time.time()
+    with _LOCK:
+        cached = _HTTP_CACHE.get(key)
+        if cached:
+            _HTTP_CACHE.move_to_end(key)
+    if cached and not nocache and now - cached[0] < SOUP_CACHE_TTL:
+        return cached[3]
+    disk = None
+    if cached is None and FUDBAL91_CACHE_MODE in ("enabled", "replay"):
+        disk = _disk_get(url)
+        if disk and (FUDBAL91_CACHE_MODE == "replay" or (not nocache and now - disk[0] < SOUP_CACHE_TTL)):
+            try:
+                soup = BeautifulSoup(disk[3], _PARSER, parse_only=strainer)
+            except Exception:
+                return None
+            _cache_put(key, (disk[0], disk[1], disk[2], soup))
+            return soup
+    if FUDBAL91_CACHE_MODE == "replay":
+        return cached[3] if cached else None
+    validators = cached or disk
+    try:
+        # Istekao unos se ne briše – njegov ETag/Last-Modified služi za conditional GET
+        headers = {}
+        if validators:
+            if validators[1]:
+                headers["If-None-Match"] = validators[1]
+            if validators[2]:
+                headers["If-Modified-Since"] = validators[2]
+        if not _BUCKET.acquire():
+            # Limit je iscrpljen duže od max_wait – zastarela kopija (ako postoji) umesto čekanja
+            if cached:
+                return cached[3]
+            return BeautifulSoup(disk[3], _PARSER, parse_only=strainer) if disk else None
+        r = _get_session().get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
+        if r.status_code == 304 and validators:
+            soup = cached[3] if cached else BeautifulSoup(disk[3], _PARSER, parse_only=strainer)
+            _cache_put(key, (now, validators[1], validators[2], soup))
+            if disk:
+                _disk_put(url, now, disk[1], disk[2], disk[3])
+            return soup
         if r.status_code != 200:
             return None
-        return BeautifulSoup(r.text, "html.parser")
+        html = r.text
+        soup = BeautifulSoup(html, _PARSER, parse_only=strainer)
+        etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+        _cache_put(key, (now, etag, last_modified, soup))
+        if FUDBAL91_CACHE_MODE == "enabled":
+            _disk_put(url, now, etag, last_modified, html)
+        return soup
     except Exception:
+        # stale-if-error: zastarela kopija sa diska je bolja od praznog rezultata
+        if disk:
+            try:
+                return BeautifulSoup(disk[3], _PARSER, parse_only=strainer)
+            except Exception:
+                return None
         return None
 
 
-def fetch_quick_odds(hours: Optional[int] = WINDOW_HOURS) -> Dict:
+def _row_match_and_kickoff(row) -> Tuple[str, Optional[datetime]]:
+    """Timovi i početak utakmice iz reda tabele. Ceo tekst reda (skup get_text preko celog podstabla)
+    računa se najviše jednom i samo ako ciljani selektori ne daju rezultat."""
+    row_text = None
+    # Teams
+    home = row.find(class_=_HOME_CLASSES)
+    away = row.find(class_=_AWAY_CLASSES)
+    if home and away:
+        teams = f"{home.get_text(strip=True)} - {away.get_text(strip=True)}"
+    else:
+        teams = " ".join(el.get_text(" ", strip=True) for el in row.find_all(class_=_TEAMS_CLASSES))
+        if not teams:
+            # Fallback regex from full row text
+            row_text = row.get_text(" ", strip=True)
+            m = _TEAMS_RE.search(row_text)
+            teams = f"{m.group(1)} - {m.group(2)}" if m else row_text[:200]
+    time_el = row.find(_is_time_el)
+    if time_el and time_el.has_attr('datetime'):
+        ko_text = time_el.get('datetime', '')
+    else:
+        ko_text = (time_el.get_text(strip=True) if time_el else "")
+        if not ko_text:
+            # Try data attributes on row
+            for attr in ('data-kickoff', 'data-time', 'data-date'):
+                if row.has_attr(attr):
+                    ko_text = row.get(attr) or ''
+                    break
+    kickoff = _parse_kickoff(ko_text)
+    if kickoff is None:
+        if row_text is None:
+            row_text = row.get_text(" ", strip=True)
+        kickoff = _parse_kickoff(row_text)
+    return teams, kickoff
+
+
+def fetch_quick_odds(hours: Optional[int] = WINDOW_HOURS, nocache: bool = False) -> Dict:
     url = "https://www.fudbal91.com/quick_odds"
-    soup = _get_soup(url)
+    soup = _get_soup(url, nocache=nocache)
     items: List[Dict] = []
     if not soup:
         return {"source": url, "items": items}
+    bounds = _window_bounds(hours)
 
     # Heuristic selectors
-    rows = soup.select(
-        "table tr, .match, .row, .match-row, .fixture-row, .event-row, .game, .fixture"
-    )
+    rows = _QUICK_ROWS_SEL.select(soup)
     for row in rows:
         try:
-            league = (row.select_one(".league") or row.select_one(".comp") or row.select_one(".competition")
-                      or row.find(attrs={"data-league": True}))
+            teams_text, kickoff = _row_match_and_kickoff(row)
+            # Redovi van prozora se preskaču pre čitanja lige i kvota
+            if not _within_window(kickoff, bounds):
+                continue
+            league = _first_by_class(row, _LEAGUE_CLASSES) or row.find(attrs={"data-league": True})
             league_name = league.get_text(strip=True) if league else ""
-            # Teams
-            home = row.select_one('.home, .team-home, .home-team, .team1')
-            away = row.select_one('.away, .team-away, .away-team, .team2')
-            if home and away:
-                teams_text = f"{home.get_text(strip=True)} - {away.get_text(strip=True)}"
-            else:
-                teams_text = " ".join(el.get_text(" ", strip=True) for el in row.select(".teams, .match-name, .teams-wrap"))
-                if not teams_text:
-                    # Fallback regex from full row text
-                    txt = row.get_text(" ", strip=True)
-                    m = re.search(r"([\w .'-]+)\s*[-–]\s*([\w .'-]+)", txt)
-                    teams_text = f"{m.group(1)} - {m.group(2)}" if m else txt[:200]
-            time_el = row.select_one("time, .kickoff, .ko, .date, .time")
-            if time_el and time_el.has_attr('datetime'):
-                ko_text = time_el.get('datetime', '')
-            else:
-                ko_text = (time_el.get_text(strip=True) if time_el else "")
-                if not ko_text:
-                    # Try data attributes on row
-                    for attr in ['data-kickoff', 'data-time', 'data-date']:
-                        if row.has_attr(attr):
-                            ko_text = row.get(attr) or ''
-                            break
-            kickoff = _parse_kickoff(ko_text) or _parse_kickoff(row.get_text(" ", strip=True))
-
-            # Odds
+
+            # Odds – jedan prolaz kroz red za data-market elemente i (po potrebi) jedan regex prolaz
+            # po td ćeliji za sve oznake odjednom; za svaku oznaku pamti se prva ćelija koja je sadrži
             odds = {}
-            for lab in ["1", "X", "2", "1X", "12", "X2", "O2.5", "U2.5"]:
-                el = row.find(attrs={"data-market": lab}) or row.find("td", string=re.compile(rf"\b{re.escape(lab)}\b"))
+            markets: Dict[str, object] = {}
+            for el in row.find_all(attrs={"data-market": True}):
+                markets.setdefault(el.get("data-market"), el)
+            label_cells: Optional[Dict[str, object]] = None
+            for lab in _ODDS_LABELS:
+                el = markets.get(lab)
+                if el is None:
+                    if label_cells is None:
+                        label_cells = {}
+                        for td in row.find_all("td"):
+                            if td.string is not None:
+                                for m in _ODDS_LABEL_RE.finditer(td.string):
+                                    label_cells.setdefault(m.group(), td)
+                    el = label_cells.get(lab)
                 if el:
                     # Value might be next sibling or in same cell
                     val = None
@@ -113,44 +418,45 @@ def fetch_quick_odds(hours: Optional[int] = WINDOW_HOURS) -> Dict:
                         val = el.get_text(strip=True)
                     odds[lab] = val
 
-            if _within_window(kickoff, hours=hours):
-                items.append({
-                    "league": league_name,
-                    "match": teams_text,
-                    "kickoff": kickoff.isoformat() if kickoff else None,
-                    "odds": odds
-                })
+            items.append({
+                "league": league_name,
+                "match": teams_text,
+                "kickoff": kickoff.isoformat() if kickoff else None,
+                "odds": odds
+            })
         except Exception:
             continue
     return {"source": url, "items": items}
 
 
-def fetch_odds_changes(hours: Optional[int] = WINDOW_HOURS) -> Dict:
+def fetch_odds_changes(hours: Optional[int] = WINDOW_HOURS, nocache: bool = False) -> Dict:
     url = "https://www.fudbal91.com/odds_changes"
-    soup = _get_soup(url)
+    soup = _get_soup(url, nocache=nocache)
     items: List[Dict] = []
     if not soup:
         return {"source": url, "items": items}
+    bounds = _window_bounds(hours)
 
-    blocks = soup.select(".change, .odds-change, table tr, .row, .event-row")
+    blocks = _CHANGE_BLOCKS_SEL.select(soup)
+    texts: List[str] = []
     for b in blocks:
         try:
             txt = b.get_text(" ", strip=True)
             kickoff = _parse_kickoff(txt)
-            if not _within_window(kickoff, hours=hours):
+            if not _within_window(kickoff, bounds):
                 continue
-            match = txt[:140]
-            # Extract any number-like odds changes
-            odds = {}
-            for token in re.findall(r"\b\d+\.\d+\b", txt):
-                odds.setdefault("values", []).append(token)
+            texts.append(txt)
             items.append({
-                "match": match,
+                "match": txt[:140],
                 "kickoff": kickoff.isoformat() if kickoff else None,
-                "changes": odds
+                "changes": {}
             })
         except Exception:
             continue
+    # Extract any number-like odds changes – jedan regex prolaz za sve blokove
+    for item, tokens in zip(items, _matches_per_segment(_ODDS_TOKEN_RE, texts, ODDS_VALUES_MAX)):
+        if tokens:
+            item["changes"]["values"] = tokens
     return {"source": url, "items": items}
 
 
@@ -165,60 +471,58 @@ COMPETITION_MAP = {
 }
 
 
-def fetch_competition(url_or_key: str, hours: Optional[int] = WINDOW_HOURS) -> Dict:
+def fetch_competition(url_or_key: str, hours: Optional[int] = WINDOW_HOURS, nocache: bool = False) -> Dict:
     url = COMPETITION_MAP.get(url_or_key.lower(), url_or_key)
-    soup = _get_soup(url)
+    soup = _get_soup(url, nocache=nocache)
     items: List[Dict] = []
     if not soup:
         return {"source": url, "items": items}
+    bounds = _window_bounds(hours)
 
     # Try to find match rows
-    rows = soup.select(
-        "table tr, .match, .fixture, .game, .match-row, .fixture-row, .event-row, .row"
-    )
+    rows = _COMPETITION_ROWS_SEL.select(soup)
+    # Naslov takmičenja je isti za sve redove – traži se jednom po stranici
+    league_el = _COMPETITION_TITLE_SEL.select_one(soup)
+    league_name = league_el.get_text(strip=True) if league_el else ""
+    odds_rows: List[Dict] = []
+    odds_texts: List[str] = []
     for row in rows:
         try:
-            league_el = soup.select_one("h1, .competition-title, .title, header h1, .page-title")
-            league_name = league_el.get_text(strip=True) if league_el else ""
-            # Teams extraction
-            home = row.select_one('.home, .team-home, .home-team, .team1')
-            away = row.select_one('.away, .team-away, .away-team, .team2')
-            if home and away:
-                teams = f"{home.get_text(strip=True)} - {away.get_text(strip=True)}"
-            else:
-                teams = " ".join(e.get_text(" ", strip=True) for e in row.select(".teams, .match-name, .teams-wrap"))
-                if not teams:
-                    txt = row.get_text(" ", strip=True)
-                    m = re.search(r"([\w .'-]+)\s*[-–]\s*([\w .'-]+)", txt)
-                    teams = f"{m.group(1)} - {m.group(2)}" if m else txt[:200]
-            time_el = row.select_one("time, .kickoff, .ko, .date, .time")
-            if time_el and time_el.has_attr('datetime'):
-                ko_text = time_el.get('datetime', '')
-            else:
-                ko_text = (time_el.get_text(strip=True) if time_el else "")
-                if not ko_text:
-                    for attr in ['data-kickoff', 'data-time', 'data-date']:
-                        if row.has_attr(attr):
-                            ko_text = row.get(attr) or ''
-                            break
-            kickoff = _parse_kickoff(ko_text) or _parse_kickoff(row.get_text(" ", strip=True))
+            teams, kickoff = _row_match_and_kickoff(row)
+            if not _within_window(kickoff, bounds):
+                continue
 
-            odds = {}
-            odds_cells = row.select("td")
+            odds_cells = row.find_all("td")
+            item = {
+                "league": league_name,
+                "match": teams,
+                "kickoff": kickoff.isoformat() if kickoff else None,
+                "odds": {}
+            }
             if odds_cells and len(odds_cells) <= 10:
-                # naive grab float-like numbers
-                floats = re.findall(r"\d+\.\d+", " ".join(c.get_text(" ", strip=True) for c in odds_cells))
-                if floats:
-                    odds["list"] = floats[:10]
-
-            if _within_window(kickoff, hours=hours):
-                items.append({
-                    "league": league_name,
-                    "match": teams,
-                    "kickoff": kickoff.isoformat() if kickoff else None,
-                    "odds": odds
-                })
+                odds_rows.append(item)
+                odds_texts.append(" ".join(c.get_text(" ", strip=True) for c in odds_cells))
+            items.append(item)
         except Exception:
             continue
 
+    # naive grab float-like numbers – jedan regex prolaz za sve redove
+    for item, floats in zip(odds_rows, _matches_per_segment(_FLOAT_RE, odds_texts)):
+        if floats:
+            item["odds"]["list"] = floats[:10]
+
     return {"source": url, "items": items}
+
+
+def fetch_all(keys: List[str], hours: Optional[int] = WINDOW_HOURS, nocache: bool = False) -> Dict[str, Dict]:
+    """Paralelno dohvata više takmičenja (I/O-bound); rezultat je po ulaznom ključu/URL-u."""
+    if not keys:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(keys))) as pool:
+        futures = {key: pool.submit(fetch_competition, key, hours, nocache) for key in keys}
+        return {key: future.result() for key, future in futures.items()}
+
+
+def fetch_all_competitions(hours: Optional[int] = WINDOW_HOURS, nocache: bool = False) -> Dict[str, Dict]:
+    """Sva poznata takmičenja iz COMPETITION_MAP odjednom (paralelno, deljena Session/pool)."""
+    return fetch_all(list(COMPETITION_MAP), hours, nocache)
@@ -1,11 +1,95 @@
 import os
 import base64
+import hashlib
+import heapq
 import json
+import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import io
 import tempfile
 from typing import Dict, List, Tuple, Optional
 import requests
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# (ključ u image_info, EXIF tag id) – DateTime, Make, Model, Software
+_EXIF_TAGS = (
+    ('exif_datetime', 306),
+    ('exif_make', 271),
+    ('exif_model', 272),
+    ('exif_software', 305),
+)
+
+_COLOR_MODE_DESCRIPTIONS = {
+    'RGB': 'RGB (crvena, zelena, plava)',
+    'RGBA': 'RGBA (RGB + alpha kanal)',
+    'L': 'Grayscale (crno-bela)',
+    'P': 'Palette (indeksovane boje)',
+    'CMYK': 'CMYK (cyan, magenta, žuta, crna)',
+    '1': 'Bitmap (1-bit crno-bela)'
+}
+
+# Opcioni pool procesa za dekodiranje+analizu (CPU-bound) – pravi paralelizam na više jezgara mimo GIL-a.
+# NESAKO_IMAGE_PROCESSES=0 (podrazumevano) znači obradu u niti pozivaoca
+IMAGE_PROCESS_WORKERS = int(os.environ.get('NESAKO_IMAGE_PROCESSES', '0') or 0)
+_PROCESS_POOL = None
+_PROCESS_POOL_LOCK = threading.Lock()
+
+# LRU keš rezultata obrade po sadržaju slike: (blake2b bajtova, ekstenzija, encode_base64) -> rezultat.
+# Ekstenzija je deo ključa jer validacija zavisi i od imena fajla. Ograničen brojem unosa i ukupnom
+# veličinom base64 stringova (rezultat može da sadrži i celu sliku)
+_ANALYSIS_CACHE_MAX = 512
+_ANALYSIS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_ANALYSIS_CACHE: "OrderedDict[Tuple[bytes, str, bool], Dict]" = OrderedDict()
+_ANALYSIS_CACHE_BYTES = 0
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+
+
+def _content_key(image_data, filename: str, encode_base64: bool) -> Tuple[bytes, str, bool]:
+    """Ključ keša; file-like ulaz (npr. Django UploadedFile) hešira se po chunk-ovima i vraća na početak."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(image_data, (bytes, bytearray)):
+        h.update(image_data)
+    else:
+        if hasattr(image_data, 'chunks'):
+            chunks = image_data.chunks()
+        else:
+            image_data.seek(0)
+            chunks = iter(lambda: image_data.read(1 << 20), b'')
+        for chunk in chunks:
+            h.update(chunk)
+        image_data.seek(0)
+    file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
+    return h.digest(), file_ext, encode_base64
+
+
+def _analysis_cache_get(key: Tuple[bytes, str, bool], filename: str) -> Optional[Dict]:
+    with _ANALYSIS_CACHE_LOCK:
+        result = _ANALYSIS_CACHE.get(key)
+        if result is None:
+            return None
+        _ANALYSIS_CACHE.move_to_end(key)
+    return dict(result, image_info=dict(result['image_info'], filename=filename))
+
+
+def _analysis_cache_put(key: Tuple[bytes, str, bool], result: Dict) -> None:
+    global _ANALYSIS_CACHE_BYTES
+    size = len(result.get('image_base64') or '')
+    if not result.get('success') or size > _ANALYSIS_CACHE_MAX_BYTES:
+        return
+    with _ANALYSIS_CACHE_LOCK:
+        old = _ANALYSIS_CACHE.pop(key, None)
+        if old is not None:
+            _ANALYSIS_CACHE_BYTES -= len(old.get('image_base64') or '')
+        # Kopija: pozivalac sme da menja vraćeni rečnik (npr. views dodaje 'description')
+        _ANALYSIS_CACHE[key] = dict(result)
+        _ANALYSIS_CACHE_BYTES += size
+        while len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX or _ANALYSIS_CACHE_BYTES > _ANALYSIS_CACHE_MAX_BYTES:
+            _, evicted = _ANALYSIS_CACHE.popitem(last=False)
+            _ANALYSIS_CACHE_BYTES -= len(evicted.get('image_base64') or '')
 
 class ImageProcessor:
     """Napredni sistem za obradu slika sa AI analizom"""
@@ -15,29 +99,72 @@ class ImageProcessor:
         self.max_file_size = 10 * 1024 * 1024  # 10MB
         self.max_dimensions = (2048, 2048)
         
-    def process_uploaded_image(self, image_data: bytes, filename: str) -> Dict:
-        """Obrađuje upload-ovanu sliku"""
+    @staticmethod
+    def _as_fileobj(image_data) -> Tuple[io.IOBase, int]:
+        """Vraća (file-like, veličina) za bytes ili već otvoren fajl (npr. Django UploadedFile)."""
+        if isinstance(image_data, (bytes, bytearray)):
+            return io.BytesIO(image_data), len(image_data)
+        size = getattr(image_data, 'size', None)
+        if size is None:
+            image_data.seek(0, io.SEEK_END)
+            size = image_data.tell()
+        image_data.seek(0)
+        return image_data, size
+    
+    def process_uploaded_image(self, image_data, filename: str, encode_base64: bool = True,
+                               use_cache: bool = True) -> Dict:
+        """Obrađuje upload-ovanu sliku (bytes ili file-like objekat – PIL čita direktno iz strima).
+        Ista slika (isti bajtovi i ekstenzija) se ne obrađuje ponovo – rezultat dolazi iz LRU keša."""
+        if not use_cache:
+            return self._process_uploaded_image(image_data, filename, encode_base64)
+        key = _content_key(image_data, filename, encode_base64)
+        cached = _analysis_cache_get(key, filename)
+        if cached is not None:
+            return cached
+        result = self._process_uploaded_image(image_data, filename, encode_base64)
+        _analysis_cache_put(key, result)
+        return result
+    
+    def _process_uploaded_image(self, image_data, filename: str, encode_base64: bool) -> Dict:
         try:
-            # Validate file
-            validation_result = self.validate_image(image_data, filename)
-            if not validation_result['valid']:
+            # Validate file (veličina/ekstenzija); verify() se preskače – load() ispod dekodira sliku
+            # samo jednom i baca izuzetak za neispravan fajl
+            fileobj, size = self._as_fileobj(image_data)
+            validation_result = self._validate_meta(size, filename)
+            if validation_result is not None:
                 return validation_result
             
             # Open image
-            image = Image.open(io.BytesIO(image_data))
+            try:
+                image = Image.open(fileobj)
+                image.load()
+            except Exception:
+                return self._invalid_image_result()
             
             # Get basic info
             image_info = self.get_image_info(image, filename)
             
             # Resize if needed
+            modified = False
             if image.size[0] > self.max_dimensions[0] or image.size[1] > self.max_dimensions[1]:
                 image = self.resize_image(image, self.max_dimensions)
                 image_info['resized'] = True
-            
-            # Convert to base64 for storage/display
-            buffered = io.BytesIO()
-            image.save(buffered, format=image.format or 'JPEG')
-            image_base64 = base64.b64encode(buffered.getvalue()).decode()
+                modified = True
+            
+            # Convert to base64 for storage/display (preskače se kad pozivaocu ne treba);
+            # neizmenjena slika se ne re-enkoduje – kodiraju se originalni bajtovi
+            image_base64 = None
+            if encode_base64:
+                if modified:
+                    buffered = io.BytesIO()
+                    image.save(buffered, format=image.format or 'JPEG')
+                    raw = buffered.getbuffer()  # memoryview – bez kopije enkodovanih bajtova
+                elif isinstance(image_data, (bytes, bytearray)):
+                    raw = image_data
+                else:
+                    fileobj.seek(0)
+                    raw = fileobj.read()
+                image_base64 = base64.b64encode(raw).decode('ascii')
             
             # Analyze image content
             analysis = self.analyze_image_content(image)
@@ -57,36 +184,50 @@ class ImageProcessor:
                 'error_type': 'processing_error'
             }
     
-    def validate_image(self, image_data: bytes, filename: str) -> Dict:
+    def _validate_meta(self, size: int, filename: str) -> Optional[Dict]:
+        """Provera veličine i ekstenzije bez dekodiranja; None znači da je sve u redu"""
+        # Check file size
+        if size > self.max_file_size:
+            return {
+                'valid': False,
+                'error': f'Slika je prevelika. Maksimalna veličina: {self.max_file_size // (1024*1024)}MB',
+                'error_type': 'file_too_large'
+            }
+        
+        # Check file extension
+        file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
+        if file_ext not in self.supported_formats:
+            return {
+                'valid': False,
+                'error': f'Nepodržan format. Podržani formati: {", ".join(self.supported_formats)}',
+                'error_type': 'unsupported_format'
+            }
+        
+        return None
+    
+    @staticmethod
+    def _invalid_image_result() -> Dict:
+        return {
+            'valid': False,
+            'error': 'Fajl nije validna slika',
+            'error_type': 'invalid_image'
+        }
+    
+    def validate_image(self, image_data, filename: str) -> Dict:
         """Validira upload-ovanu sliku"""
         try:
-            # Check file size
-            if len(image_data) > self.max_file_size:
-                return {
-                    'valid': False,
-                    'error': f'Slika je prevelika. Maksimalna veličina: {self.max_file_size // (1024*1024)}MB',
-                    'error_type': 'file_too_large'
-                }
-            
-            # Check file extension
-            file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
-            if file_ext not in self.supported_formats:
-                return {
-                    'valid': False,
-                    'error': f'Nepodržan format. Podržani formati: {", ".join(self.supported_formats)}',
-                    'error_type': 'unsupported_format'
-                }
+            fileobj, size = self._as_fileobj(image_data)
+            
+            meta_error = self._validate_meta(size, filename)
+            if meta_error is not None:
+                return meta_error
             
             # Try to open image
             try:
-                image = Image.open(io.BytesIO(image_data))
+                image = Image.open(fileobj)
                 image.verify()  # Verify it's a valid image
             except Exception:
-                return {
-                    'valid': False,
-                    'error': 'Fajl nije validna slika',
-                    'error_type': 'invalid_image'
-                }
+                return self._invalid_image_result()
             
             return {'valid': True}
             
@@ -108,25 +249,19 @@ class ImageProcessor:
                 'width': image.size[0],
                 'height': image.size[1],
                 'has_transparency': image.mode in ('RGBA', 'LA') or 'transparency' in image.info,
-                'color_mode': self.get_color_mode_description(image.mode),
-                'estimated_colors': len(image.getcolors(maxcolors=256)) if image.getcolors(maxcolors=256) else 'više od 256'
+                'color_mode': self.get_color_mode_description(image.mode)
             }
+            colors = image.getcolors(maxcolors=256)
+            info['estimated_colors'] = len(colors) if colors else 'više od 256'
             
             # Add EXIF data if available
-            if hasattr(image, '_getexif') and image._getexif():
-                exif = image._getexif()
-                if exif:
-                    info['has_exif'] = True
-                    # Extract common EXIF tags
-                    exif_tags = {
-                        'DateTime': 306,
-                        'Make': 271,
-                        'Model': 272,
-                        'Software': 305
-                    }
-                    for tag_name, tag_id in exif_tags.items():
-                        if tag_id in exif:
-                            info[f'exif_{tag_name.lower()}'] = exif[tag_id]
+            exif = image._getexif() if hasattr(image, '_getexif') else None
+            if exif:
+                info['has_exif'] = True
+                # Extract common EXIF tags
+                for key, tag_id in _EXIF_TAGS:
+                    if tag_id in exif:
+                        info[key] = exif[tag_id]
             
             return info
             
@@ -138,30 +273,33 @@ class ImageProcessor:
     
     def get_color_mode_description(self, mode: str) -> str:
         """Vraća opis color mode-a"""
-        descriptions = {
-            'RGB': 'RGB (crvena, zelena, plava)',
-            'RGBA': 'RGBA (RGB + alpha kanal)',
-            'L': 'Grayscale (crno-bela)',
-            'P': 'Palette (indeksovane boje)',
-            'CMYK': 'CMYK (cyan, magenta, žuta, crna)',
-            '1': 'Bitmap (1-bit crno-bela)'
-        }
-        return descriptions.get(mode, f'Nepoznat ({mode})')
+        return _COLOR_MODE_DESCRIPTIONS.get(mode, f'Nepoznat ({mode})')
     
     def resize_image(self, image: Image.Image, max_size: Tuple[int, int]) -> Image.Image:
-        """Resize sliku zadržavajući aspect ratio"""
-        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        """Resize sliku zadržavajući aspect ratio (BILINEAR – slika služi za analizu/pregled, ne za štampu)"""
+        if image.size[0] <= max_size[0] and image.size[1] <= max_size[1]:
+            return image
+        image.thumbnail(max_size, Image.Resampling.BILINEAR)
         return image
     
     def analyze_image_content(self, image: Image.Image) -> Dict:
         """Analizira sadržaj slike"""
         try:
+            # Jedna RGB konverzija/jedan niz za svetlost, kontrast i dominantne boje
+            try:
+                rgb = self._rgb_array(image)
+                gray = self._gray_from_rgb(rgb)
+                brightness = round(float(gray.mean()) / 255.0, 2)
+                contrast = round(float(gray.std()) / 255.0, 2)
+                dominant_colors = self._dominant_colors_from_rgb(rgb)
+            except Exception:
+                brightness, contrast, dominant_colors = 0.5, 0.5, []
             analysis = {
-                'brightness': self.calculate_brightness(image),
-                'contrast': self.calculate_contrast(image),
-                'dominant_colors': self.get_dominant_colors(image),
+                'brightness': brightness,
+                'contrast': contrast,
+                'dominant_colors': dominant_colors,
                 'image_type': self.classify_image_type(image),
-                'quality_assessment': self.assess_image_quality(image)
+                'quality_assessment': self.assess_image_quality(image, brightness, contrast)
             }
             
             return analysis
@@ -171,75 +309,82 @@ class ImageProcessor:
                 'error': f'Greška pri analizi: {str(e)}'
             }
     
+    @staticmethod
+    def _gray_array(image: Image.Image) -> np.ndarray:
+        """Grayscale piksele kao uint8 NumPy niz (bez Python liste piksela)."""
+        gray_image = image if image.mode == 'L' else image.convert('L')
+        return np.asarray(gray_image, dtype=np.uint8)
+    
+    def _brightness_contrast(self, image: Image.Image) -> Tuple[float, float]:
+        """Svetlost (mean) i kontrast (std) iz jednog grayscale niza, normalizovano na 0-1"""
+        try:
+            gray = self._gray_array(image)
+            return round(float(gray.mean()) / 255.0, 2), round(float(gray.std()) / 255.0, 2)
+        except Exception:
+            return 0.5, 0.5
+    
     def calculate_brightness(self, image: Image.Image) -> float:
         """Računa prosečnu svetlost slike"""
         try:
-            # Convert to grayscale if needed
-            if image.mode != 'L':
-                gray_image = image.convert('L')
-            else:
-                gray_image = image
-            
-            # Calculate average brightness
-            pixels = list(gray_image.getdata())
-            brightness = sum(pixels) / len(pixels)
-            return round(brightness / 255.0, 2)  # Normalize to 0-1
-            
+            return round(float(self._gray_array(image).mean()) / 255.0, 2)  # Normalize to 0-1
         except Exception:
             return 0.5
     
     def calculate_contrast(self, image: Image.Image) -> float:
         """Računa kontrast slike"""
         try:
-            # Convert to grayscale
-            if image.mode != 'L':
-                gray_image = image.convert('L')
-            else:
-                gray_image = image
-            
-            # Calculate standard deviation as contrast measure
-            pixels = list(gray_image.getdata())
-            mean = sum(pixels) / len(pixels)
-            variance = sum((p - mean) ** 2 for p in pixels) / len(pixels)
-            contrast = (variance ** 0.5) / 255.0  # Normalize
-            
-            return round(contrast, 2)
-            
+            # Standard deviation as contrast measure
+            return round(float(self._gray_array(image).std()) / 255.0, 2)  # Normalize
         except Exception:
             return 0.5
     
     def get_dominant_colors(self, image: Image.Image, num_colors: int = 5) -> List[Dict]:
         """Pronalazi dominantne boje u slici"""
         try:
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                rgb_image = image.convert('RGB')
-            else:
-                rgb_image = image
-            
-            # Get colors
-            colors = rgb_image.getcolors(maxcolors=256*256*256)
-            if not colors:
-                return []
-            
-            # Sort by frequency and take top colors
-            colors.sort(key=lambda x: x[0], reverse=True)
-            dominant_colors = []
-            
-            for i, (count, color) in enumerate(colors[:num_colors]):
-                percentage = (count / (image.size[0] * image.size[1])) * 100
-                dominant_colors.append({
-                    'rank': i + 1,
-                    'rgb': color,
-                    'hex': f'#{color[0]:02x}{color[1]:02x}{color[2]:02x}',
-                    'percentage': round(percentage, 1)
-                })
-            
-            return dominant_colors
-            
+            return self._dominant_colors_from_rgb(self._rgb_array(image), num_colors)
         except Exception:
             return []
     
+    @staticmethod
+    def _rgb_array(image: Image.Image) -> np.ndarray:
+        """RGB piksele kao (h, w, 3) uint8 NumPy niz – konverzija se radi najviše jednom"""
+        rgb_image = image if image.mode == 'RGB' else image.convert('RGB')
+        return np.asarray(rgb_image, dtype=np.uint8)
+    
+    @staticmethod
+    def _gray_from_rgb(rgb: np.ndarray) -> np.ndarray:
+        """Grayscale iz RGB niza istom fixed-point formulom kao PIL convert('L') (ITU-R 601-2)"""
+        rgb32 = rgb.astype(np.uint32)
+        return (rgb32[..., 0] * 19595 + rgb32[..., 1] * 38470 + rgb32[..., 2] * 7471 + 0x8000) >> 16
+    
+    @staticmethod
+    def _dominant_colors_from_rgb(rgb: np.ndarray, num_colors: int = 5) -> List[Dict]:
+        """Najčešće boje iz RGB niza: 5 bita po kanalu (32K kanti) prebrojano sa np.bincount u C-u"""
+        pixels = rgb.reshape(-1, 3)
+        total = pixels.shape[0]
+        if not total:
+            return []
+        q = ((pixels[:, 0] >> 3).astype(np.uint32) << 10) | ((pixels[:, 1] >> 3).astype(np.uint32) << 5) | (pixels[:, 2] >> 3)
+        counts = np.bincount(q, minlength=1 << 15)
+        # Top colors by frequency – nlargest (kao u NESAKO app-u) je O(n log k) nad nepraznim kantama,
+        # stabilan je pa kod jednakih brojeva manja kanta ide prva
+        buckets = np.flatnonzero(counts).tolist()
+        counts = counts.tolist()
+        top = heapq.nlargest(num_colors, buckets, key=counts.__getitem__)
+        dominant_colors = []
+        
+        for i, bucket in enumerate(top):
+            color = ((bucket >> 10) << 3, ((bucket >> 5) & 0x1F) << 3, (bucket & 0x1F) << 3)
+            percentage = (counts[bucket] / total) * 100
+            dominant_colors.append({
+                'rank': i + 1,
+                'rgb': color,
+                'hex': f'#{color[0]:02x}{color[1]:02x}{color[2]:02x}',
+                'percentage': round(percentage, 1)
+            })
+        
+        return dominant_colors
+    
     def classify_image_type(self, image: Image.Image) -> str:
         """Klasifikuje tip slike na osnovu karakteristika"""
         try:
@@ -274,8 +419,9 @@ class ImageProcessor:
         except Exception:
             return 'unknown'
     
-    def assess_image_quality(self, image: Image.Image) -> Dict:
-        """Procenjuje kvalitet slike"""
+    def assess_image_quality(self, image: Image.Image, brightness: Optional[float] = None,
+                             contrast: Optional[float] = None) -> Dict:
+        """Procenjuje kvalitet slike (već izračunata svetlost/kontrast se ne računaju ponovo)"""
         try:
             width, height = image.size
             total_pixels = width * height
@@ -288,8 +434,10 @@ class ImageProcessor:
             else:
                 resolution_quality = 'low'
             
+            if brightness is None or contrast is None:
+                brightness, contrast = self._brightness_contrast(image)
+            
             # Brightness assessment
-            brightness = self.calculate_brightness(image)
             if 0.2 <= brightness <= 0.8:
                 brightness_quality = 'good'
             elif 0.1 <= brightness <= 0.9:
@@ -298,7 +446,6 @@ class ImageProcessor:
                 brightness_quality = 'poor'
             
             # Contrast assessment
-            contrast = self.calculate_contrast(image)
             if contrast > 0.3:
                 contrast_quality = 'good'
             elif contrast > 0.15:
@@ -347,8 +494,7 @@ class ImageProcessor:
         try:
             if enhancement_type == 'auto':
                 # Auto enhancement based on image analysis
-                brightness = self.calculate_brightness(image)
-                contrast = self.calculate_contrast(image)
+                brightness, contrast = self._brightness_contrast(image)
                 
                 enhanced = image.copy()
                 
@@ -433,3 +579,51 @@ class ImageProcessor:
             
         except Exception:
             return "Analiza slike završena."
+
+
+def decode_and_analyze(image_data, filename: str, encode_base64: bool = False, use_cache: bool = True) -> Dict:
+    """Dekodiranje + analiza kao funkcija modula (picklable) – izvršava se u pool procesu"""
+    return ImageProcessor().process_uploaded_image(image_data, filename, encode_base64=encode_base64,
+                                                   use_cache=use_cache)
+
+
+def _get_process_pool() -> Optional[ProcessPoolExecutor]:
+    global _PROCESS_POOL
+    if IMAGE_PROCESS_WORKERS <= 0:
+        return None
+    # Slike se obrađuju iz više niti (_IMAGE_POOL u views) – pool se pravi tačno jednom
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is None:
+            # spawn umesto fork – roditelj (gunicorn gthread worker) ima aktivne niti
+            _PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=IMAGE_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _PROCESS_POOL
+
+
+def process_image_offloaded(image_data, filename: str, encode_base64: bool = False) -> Dict:
+    """process_uploaded_image u pool procesu ako je uključen (NESAKO_IMAGE_PROCESSES), inače lokalno.
+    File-like ulaz se pre slanja čita u bytes (Django UploadedFile nije picklable)."""
+    global _PROCESS_POOL
+    pool = _get_process_pool()
+    if pool is None:
+        return decode_and_analyze(image_data, filename, encode_base64)
+    if not isinstance(image_data, (bytes, bytearray)):
+        image_data.seek(0)
+        image_data = image_data.read()
+    # Keš živi u ovom procesu (pool procesi ga ne dele) – provera pre slanja, upis po povratku
+    key = _content_key(image_data, filename, encode_base64)
+    cached = _analysis_cache_get(key, filename)
+    if cached is not None:
+        return cached
+    try:
+        result = pool.submit(decode_and_analyze, bytes(image_data), filename, encode_base64, False).result()
+        _analysis_cache_put(key, result)
+        return result
+    except BrokenProcessPool:
+        # Pool je pao (npr. OOM u procesu) – sledeći poziv pravi novi, ovaj se obrađuje lokalno
+        with _PROCESS_POOL_LOCK:
+            if _PROCESS_POOL is pool:
+                _PROCESS_POOL = None
+        return decode_and_analyze(image_data, filename, encode_base64)
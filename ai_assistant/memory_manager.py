@@ -121,14 +121,15 @@ class PersistentMemoryManager:
             try:
                 from django.apps import apps
                 Conversation = apps.get_model('ai_assistant', 'Conversation')
-                qs = Conversation.objects.order_by('-created_at')[:limit]
-                rows = list(qs)
+                # values_list: samo tri kolone kao tuple, bez pravljenja model instanci
+                rows = Conversation.objects.order_by('-created_at').values_list(
+                    'user_input', 'assistant_response', 'created_at')[:limit]
                 history = []
-                for row in rows:
+                for user_input, assistant_response, created_at in rows:
                     history.append({
-                        'user_message': getattr(row, 'user_input', ''),
-                        'ai_response': getattr(row, 'assistant_response', ''),
-                        'timestamp': row.created_at.isoformat() if getattr(row, 'created_at', None) else '',
+                        'user_message': user_input or '',
+                        'ai_response': assistant_response or '',
+                        'timestamp': created_at.isoformat() if created_at else '',
                         'tools_used': [],
                         'context_data': {}
                     })
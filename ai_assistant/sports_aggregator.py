@@ -87,10 +87,14 @@ def fetch_fudbal91(team: Optional[str], key: Optional[str], date: Optional[str],
     if not fudbal91:
         return {"source": "fudbal91", "items": [], "error": "module_unavailable"}
     try:
-        if key:
-            data = fudbal91.fetch_competition(key, hours=hours)
+        if key == "all":
+            # Sva takmičenja paralelno (deljena Session) – stavke se spajaju u jednu listu
+            per_key = fudbal91.fetch_all_competitions(hours=hours, nocache=nocache)
+            data = {"items": [it for d in per_key.values() for it in d.get("items", [])]}
+        elif key:
+            data = fudbal91.fetch_competition(key, hours=hours, nocache=nocache)
         else:
-            data = fudbal91.fetch_quick_odds(hours=hours)
+            data = fudbal91.fetch_quick_odds(hours=hours, nocache=nocache)
         data["source"] = "fudbal91"
         # Team filter
         if team:
@@ -296,6 +296,9 @@ class HeavyTaskProcessor:
             'created_at': task['created_at'].isoformat(),
             'started_at': task['started_at'].isoformat() if task['started_at'] else None,
             'completed_at': task['completed_at'].isoformat() if task['completed_at'] else None,
+            # Epoch sekunde – potrošači računaju trajanje bez parsiranja ISO stringova
+            'started_ts': task['started_at'].timestamp() if task['started_at'] else None,
+            'completed_ts': task['completed_at'].timestamp() if task['completed_at'] else None,
             'retry_count': task['retry_count'],
             'error': task['error'],
             'result': task['result'] if task['status'] == TaskStatus.COMPLETED else None,
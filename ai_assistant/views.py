@@ -1,20 +1,32 @@
+import atexit
+import hashlib
+import hmac
 import json
+import logging
 import os
+import secrets
 import requests
 import time
 import subprocess
 import tempfile
+import threading
 import re
 import urllib.parse
 from datetime import datetime
 import pytz
-from django.http import JsonResponse
+try:
+    import orjson  # brži JSON parser; opciono
+except ImportError:
+    orjson = None
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views import View
 from django.views.generic import TemplateView
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.shortcuts import redirect
 from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
 from django.http import FileResponse, JsonResponse
 from django.middleware.csrf import get_token
 from bs4 import BeautifulSoup
@@ -23,8 +35,12 @@ import base64
 from typing import Any, Dict, List, Optional
 import importlib
 import inspect
+import functools
+import itertools
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from .memory_manager import PersistentMemoryManager
-from .image_processor import ImageProcessor
+from .image_processor import ImageProcessor, process_image_offloaded
 from .command_generator import CommandGenerator
 from .module_manager import ModuleManager
 from .file_operations import FileOperationsManager
@@ -32,6 +48,337 @@ from .task_processor import task_processor, create_code_analysis_task, create_fi
 from .nesako_chatbot import NESAKOChatbot
 from .models import LessonLearned
 
+logger = logging.getLogger('nesako.views')
+
+# DeepSeek konfiguracija se čita jednom pri učitavanju modula (settings.py upozorava ako ključ nedostaje)
+DEEPSEEK_URL = 'https://api.deepseek.com/v1/chat/completions'
+DEEPSEEK_API_KEY = os.environ.get('DEEPSEEK_API_KEY')
+DEEPSEEK_HEADERS = {
+    'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
+    'Content-Type': 'application/json'
+} if DEEPSEEK_API_KEY else None
+
+# (connect, read) timeout-i za DeepSeek; podesivi preko env-a
+DEEPSEEK_CONNECT_TIMEOUT = float(os.environ.get('DEEPSEEK_CONNECT_TIMEOUT', '5'))
+DEEPSEEK_TIMEOUT = (DEEPSEEK_CONNECT_TIMEOUT, float(os.environ.get('DEEPSEEK_READ_TIMEOUT', '60')))
+DEEPSEEK_STREAM_TIMEOUT = (DEEPSEEK_CONNECT_TIMEOUT, float(os.environ.get('DEEPSEEK_STREAM_READ_TIMEOUT', '120')))
+
+_DEEPSEEK_SESSION = None
+
+
+def _deepseek_session():
+    """Lenjo napravljena requests.Session za DeepSeek: keep-alive TLS konekcija + retry na 502/503/504.
+    Retry samo za greške konekcije i 502/503/504 odgovore – read timeout se nikad ne ponavlja (POST je
+    naplaćen i možda već obrađen), a read=False ga propušta kao requests Timeout do fallback handlera."""
+    global _DEEPSEEK_SESSION
+    if _DEEPSEEK_SESSION is None:
+        from urllib3.util.retry import Retry
+        session = requests.Session()
+        session.mount('https://', requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=2, connect=2, read=False, status=2,
+                backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=frozenset({'POST'}),
+                # Posle poslednjeg pokušaja vraća se 5xx odgovor (postojeća status_code grana), ne RetryError
+                raise_on_status=False,
+            ),
+        ))
+        if DEEPSEEK_HEADERS:
+            session.headers.update(DEEPSEEK_HEADERS)
+        _DEEPSEEK_SESSION = session
+    return _DEEPSEEK_SESSION
+
+# Obrada upload-ovanih slika (PIL oslobađa GIL) – deljeni pool, max 3 slike po zahtevu
+_IMAGE_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix='nesako-img')
+
+
+def _process_one_image(image_processor, name, uploaded_file):
+    """Obrađuje jednu sliku i pravi opis; vraća rezultat process_uploaded_image + 'description'.
+    Ponovljene slike dolaze iz keša po sadržaju u image_processor-u; PIL čita direktno iz strima.
+    """
+    # Base64 se ne koristi u odgovoru – preskačemo enkodiranje cele slike
+    result = process_image_offloaded(uploaded_file, name, encode_base64=False)
+    if result.get('success'):
+        result['description'] = image_processor.generate_image_description(result['analysis'], result['image_info'])
+    return result
+
+# Pozadinski upisi u memoriju – odgovor se ne blokira na DB write
+_BG = ThreadPoolExecutor(max_workers=2, thread_name_prefix='nesako-bg')
+atexit.register(_BG.shutdown)
+
+
+def _save_conversation_bg(memory, **kwargs):
+    """Poziva memory.save_conversation u pozadinskoj niti; greške se samo loguju."""
+    try:
+        memory.save_conversation(**kwargs)
+    except Exception as e:
+        logger.warning("Background conversation save failed: %s", e)
+    finally:
+        close_old_connections()
+
+# Sistemska poruka za analizu slika – menjaju se samo polja za vreme
+_IMAGE_SYSTEM_TMPL = """Ti si NESAKO AI - napredni asistent za analizu slika i vizuelni sadržaj.
+
+TRENUTNO VREME: {t}, {d}, {date}
+
+SPECIJALIZACIJA ZA SLIKE:
+🖼️ Detaljno analiziram sve aspekte slika (kompozicija, boje, kvalitet, sadržaj)
+🔍 Prepoznajem objekte, tekst, ljude, arhitekturu, prirodu
+🎨 Dajem savete za poboljšanje fotografija i dizajna
+💡 Predlažem kreativne ideje i izmene
+🛠️ Objašnjavam tehničke aspekte (osvetljenje, kontrast, rezolucija)
+📊 Poredim više slika i dajem komparativnu analizu
+
+INSTRUKCIJE:
+- Analiziraj svaku sliku detaljno i precizno
+- Koristi srpski jezik za sve odgovore
+- Daj praktične savete i preporuke
+- Budi kreativan i koristan
+- Fokusiraj se na ono što korisnik pita
+
+Odgovori direktno i korisno na osnovu analize slika."""
+
+# Delovi korisničkog prompta za analizu slika (spajaju se sa opisima slika i zahtevom)
+_PROMPT_WITH_INSTR = (
+    "ANALIZA SLIKA:\n",
+    "\n\nKORISNIKOV ZAHTEV:\n",
+    "\n\nMolim analiziraj upload-ovane slike i odgovori na korisnikov zahtev. Koristi detalje iz analize slika da daš precizan i koristan odgovor.",
+)
+_PROMPT_NO_INSTR = (
+    "ANALIZA UPLOAD-OVANIH SLIKA:\n",
+    "\n\nMolim analiziraj ove slike i daj detaljnu analizu sa preporukama za poboljšanje ili dalju obradu.",
+)
+
+# Budžet tokena za analizu slika (sa korisnikovim zahtevom / samo slike)
+_IMAGE_MAX_TOKENS = 3000
+_IMAGE_ONLY_MAX_TOKENS = 1200
+
+# Reči-punioci koje reformulacija upita izbacuje
+_FILLER_WORDS = frozenset(('molim', 'te', 'da', 'mi', 'kažeš', 'pomozi', 'sa', 'o'))
+
+BELGRADE_TZ = pytz.timezone('Europe/Belgrade')
+# Dani na srpskom, indeksirani po datetime.weekday() (0 = ponedeljak)
+_DAYS_SR = ('ponedeljak', 'utorak', 'sreda', 'četvrtak', 'petak', 'subota', 'nedelja')
+_TIME_CACHE = {'t': 0.0, 'v': None}
+
+
+def cached_time():
+    """(datetime, 'HH:MM', 'dd.mm.YYYY', dan na srpskom) za Beograd – osvežava se najviše jednom u sekundi."""
+    now = time.time()
+    if now - _TIME_CACHE['t'] >= 1.0:
+        dt = datetime.now(BELGRADE_TZ)
+        _TIME_CACHE.update(t=now, v=(dt, dt.strftime("%H:%M"), dt.strftime("%d.%m.%Y"), _DAYS_SR[dt.weekday()]))
+    return _TIME_CACHE['v']
+
+# Putanje do manifest.json normalizovane jednom (STATIC_ROOT može biti str ili Path)
+STATIC_ROOT_PATH = Path(settings.STATIC_ROOT) if getattr(settings, 'STATIC_ROOT', None) else None
+MANIFEST_CANDIDATE = str(STATIC_ROOT_PATH / 'manifest.json') if STATIC_ROOT_PATH else None
+STATIC_MANIFEST_PATH = Path(settings.BASE_DIR) / 'static' / 'manifest.json'
+
+# Keš web pretrage: vremenski osetljivi upiti žive kraće
+SERP_CACHE_TTL = 300
+SERP_CACHE_TTL_LIVE = 30
+_LIVE_QUERY_WORDS = ('danas', 'sada', 'utakmica', 'rezultat')
+
+# Prekompajlirani regexi za izvlačenje koda/putanja i detekciju kritičnih pretnji
+_CODE_BLOCK_RE = re.compile(r'```(?:\w+)?\n(.*?)\n```', re.DOTALL)
+_QUOTED_PATH_RE = re.compile(r'"([^"]+\.[a-zA-Z0-9]+)"')
+_WIN_PATH_RE = re.compile(r'[A-Za-z]:\\[^\\/:*?"<>|\r\n]+\.[a-zA-Z0-9]+')
+# (obavezni lowercase podstring, regex) – regex se pokreće samo ako je podstring prisutan
+_CRITICAL_REGEXES = (
+    ('-rf', re.compile(r'rm\s+-rf\s+/\s*$', re.IGNORECASE)),  # Root deletion
+    ('format', re.compile(r'format\s+c:', re.IGNORECASE)),       # Format C drive
+    ('/q', re.compile(r'del\s+/s\s+/q\s+c:\\', re.IGNORECASE)),  # Delete C drive
+    ('database', re.compile(r'DROP\s+DATABASE\s+\*', re.IGNORECASE)),  # Drop all databases
+)
+
+
+
+def _keyword_regex(keywords):
+    """Jedan kompajliran regex (alternacija) umesto niza `k in text` provera – tekst se skenira jednom."""
+    return re.compile('|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
+def _keyword_scanner(table):
+    """(oznaka, ključne reči) tabela → (regex, oznake po ključnoj reči) za _scan_labels.
+    Regex sa lookahead-om nalazi ključnu reč na svakoj poziciji (i preklapanja, kao `kw in text`).
+    Na istoj poziciji pobeđuje najduža reč, pa joj se pripisuju i oznake svih reči koje su joj prefiks."""
+    labels_by_kw = defaultdict(set)
+    for label, kws in table:
+        for kw in kws:
+            labels_by_kw[kw].add(label)
+    expanded = {
+        kw: frozenset().union(*(labels for other, labels in labels_by_kw.items() if kw.startswith(other)))
+        for kw in labels_by_kw
+    }
+    alternation = '|'.join(re.escape(k) for k in sorted(labels_by_kw, key=len, reverse=True))
+    return re.compile(f'(?=({alternation}))'), expanded
+
+
+def _scan_labels(scanner, text):
+    """Skup oznaka čije se ključne reči pojavljuju u tekstu – jedan prolaz kroz tekst."""
+    regex, labels_by_kw = scanner
+    found = set()
+    for kw in regex.findall(text):
+        found |= labels_by_kw[kw]
+    return found
+
+
+# Klasifikatori zadataka (ulaz se prosleđuje već lowercase)
+_HEAVY_STUB_RE = _keyword_regex(['analyze repo', 'code analysis', 'large file', 'process project', 'rollback', 'deploy'])
+_COMPLEX_STUB_RE = _keyword_regex(['kompleks', 'complex', 'plan', 'arhitekt', 'refactor', 'migrate', 'docker', 'kubernetes'])
+_HEAVY_TASK_RE = _keyword_regex([
+    'analiziraj kod', 'code analysis', 'optimize code', 'deep analysis',
+    'procesiraj fajl', 'process file', 'analyze file', 'large file',
+    'train model', 'machine learning', 'ai training', 'data processing',
+    'heavy computation', 'complex analysis', 'batch processing'
+])
+_COMPLEX_TASK_RE = _keyword_regex([
+    'kreiraj', 'napravi', 'build', 'create', 'develop', 'implementiraj',
+    'aplikacija', 'app', 'website', 'web', 'sistem', 'database',
+    'api', 'backend', 'frontend', 'full stack', 'projekt'
+])
+# Redosled je prioritet (prvo poklapanje pobeđuje)
+_OPERATION_RES = (
+    ('analyze', _keyword_regex(['analyze', 'analiziraj'])),
+    ('convert', _keyword_regex(['convert', 'konvertuj'])),
+    ('compress', _keyword_regex(['compress', 'kompresuj'])),
+    ('backup', _keyword_regex(['backup', 'bekap'])),
+)
+
+# Potpisi programskih jezika (lowercase) → jezik; redosled u _LANG_PRIORITY je prioritet
+_LANG_SIGNATURES = {
+    'python': ['def ', 'import ', 'print(', 'if __name__'],
+    'javascript': ['function', 'const ', 'let ', 'var ', 'console.log'],
+    'java': ['public class', 'public static void', 'system.out'],
+    'c++': ['#include', 'int main', 'printf', 'cout'],
+    'sql': ['select', 'from', 'where', 'insert'],
+}
+_LANG_PRIORITY = tuple(_LANG_SIGNATURES)
+_LANG_SCANNER = _keyword_scanner(_LANG_SIGNATURES.items())
+
+# Učenje iz razgovora: skupovi ključnih reči (tokeni) i fraze za tipove projekata
+_LEARN_TOKEN_RE = re.compile(r'[a-z+#]+')
+_LEARN_LANGS = frozenset({'python', 'javascript', 'typescript', 'java', 'c++', 'html', 'css', 'sql', 'react', 'vue', 'angular'})
+_LEARN_FRAMEWORKS = frozenset({'django', 'flask', 'fastapi', 'express', 'react', 'vue', 'angular', 'bootstrap'})
+_LEARN_PROJECT_TYPES = (
+    ('web_development', ('web app', 'aplikacija', 'website')),
+    ('api_development', ('api', 'rest', 'microservice')),
+    ('data_analysis', ('analiza', 'data', 'statistik')),
+)
+_LEARN_LANG_PATTERNS = {
+    'python': frozenset({'python', 'django', 'flask', 'fastapi', '.py'}),
+    'javascript': frozenset({'javascript', 'js', 'node', 'react', 'vue', 'angular'}),
+    'typescript': frozenset({'typescript', 'ts'}),
+    'java': frozenset({'java', 'spring'}),
+    'csharp': frozenset({'c#', 'csharp', '.net', 'asp.net'}),
+    'php': frozenset({'php', 'laravel', 'symfony'}),
+    'go': frozenset({'golang', 'go'}),
+    'rust': frozenset({'rust'}),
+    'cpp': frozenset({'c++', 'cpp'}),
+}
+_LEARN_FW_PATTERNS = {
+    'django': frozenset({'django'}),
+    'react': frozenset({'react', 'reactjs'}),
+    'vue': frozenset({'vue', 'vuejs'}),
+    'angular': frozenset({'angular'}),
+    'express': frozenset({'express', 'expressjs'}),
+    'flask': frozenset({'flask'}),
+    'fastapi': frozenset({'fastapi'}),
+}
+
+# Tip naprednog zadatka: redosled je prioritet, podrazumevano 'web_app'
+_TASK_CATEGORIES = (
+    ('api', ('api', 'rest', 'graphql', 'microservice', 'endpoint')),
+    ('data_analysis', ('analiza', 'podatak', 'data', 'statistik', 'ml', 'ai')),
+    ('mobile_app', ('mobile', 'android', 'ios', 'react native')),
+    ('desktop_app', ('desktop', 'electron', 'tkinter', 'qt')),
+)
+_TASK_CATEGORY_SCANNER = _keyword_scanner(_TASK_CATEGORIES)
+
+# Planovi za create_and_execute_plan (po tipu zadatka)
+_ADVANCED_PLANS: Dict[str, str] = {
+    'web_app': """🚀 NAPREDNI WEB APP PLAN:
+1. 📋 Arhitekturna analiza i tehnološki stack
+2. 🏗️ Kreiranje scalable strukture sa microservices
+3. 🎨 Modern UI/UX sa responsive design
+4. ⚙️ Backend sa REST API i GraphQL
+5. 🔗 Frontend-backend integracija sa state management
+6. 🧪 Comprehensive testing (unit, integration, e2e)
+7. 🛡️ Security implementation (auth, CORS, validation)
+8. 🚀 CI/CD pipeline i production deployment
+9. 📊 Monitoring, logging i analytics
+10. 📚 Kompletna dokumentacija i API specs""",
+    'api': """🚀 ENTERPRISE API PLAN:
+1. 📋 OpenAPI 3.0 specifikacija
+2. 🏗️ Microservices arhitektura
+3. 🔧 RESTful endpoints sa GraphQL
+4. 🛡️ JWT authentication i rate limiting
+5. 📊 Database design sa optimizacijom
+6. 🧪 Automated testing suite
+7. 📖 Interactive API dokumentacija
+8. 🚀 Docker containerization i K8s deployment
+9. 📈 Performance monitoring i caching
+10. 🔄 Versioning i backward compatibility""",
+    'data_analysis': """🚀 NAPREDNA DATA ANALIZA:
+1. 📊 Data pipeline arhitektura
+2. 🧹 ETL procesi sa data validation
+3. 📈 Eksplorativna analiza sa vizualizacijama
+4. 🤖 Machine learning modeli
+5. 📋 Interactive dashboards
+6. 📝 Automated reporting
+7. 📊 Real-time analytics
+8. 🚀 Cloud deployment (AWS/GCP/Azure)
+9. 🔄 Model monitoring i retraining
+10. 📚 Kompletna dokumentacija i insights""",
+    'mobile_app': """🚀 MOBILNA APLIKACIJA PLAN:
+1. 📋 Definicija funkcionalnosti i dizajna
+2. 🏗️ Kreiranje mobilne aplikacije sa React Native ili Flutter
+3. 🎨 UI/UX dizajn sa korisničkim iskustvom
+4. 🔗 Integracija sa backend servisima
+5. 🧪 Testiranje aplikacije
+6. 📈 Optimizacija performansi
+7. 📊 Analitika i monitoring
+8. 📚 Dokumentacija i podrška""",
+    'desktop_app': """🚀 DESKTOP APLIKACIJA PLAN:
+1. 📋 Definicija funkcionalnosti i dizajna
+2. 🏗️ Kreiranje desktop aplikacije sa Electron ili Qt
+3. 🎨 UI/UX dizajn sa korisničkim iskustvom
+4. 🔗 Integracija sa backend servisima
+5. 🧪 Testiranje aplikacije
+6. 📈 Optimizacija performansi
+7. 📊 Analitika i monitoring
+8. 📚 Dokumentacija i podrška"""
+}
+
+# Zaglavlje odgovora kada analiza slika radi bez AI servisa
+_IMAGE_FALLBACK_HEADER = (
+    "📸 **ANALIZA SLIKA (FALLBACK MODE)**",
+    "AI servis je trenutno nedostupan, ali evo osnovne analize:",
+)
+
+# Greške DeepSeek poziva → (sufiks za mode, napomena u odgovoru). Proverava se isinstance redom, kao
+# nekadašnji lanac except-ova: Timeout pre ConnectionError (ConnectTimeout je oba), podklase
+# (SSLError, ProxyError, ...) pogađaju svog roditelja
+_API_ERROR_MODES = (
+    (requests.exceptions.Timeout, ('timeout', 'Fallback used due to API timeout')),
+    (requests.exceptions.ConnectionError, ('connection', 'Fallback used due to connection error')),
+)
+
+
+def _api_error_mode(error: Exception):
+    for exc_class, mode in _API_ERROR_MODES:
+        if isinstance(error, exc_class):
+            return mode
+    return 'error', f'Fallback used due to API error: {str(error)}'
+
+# Ključne reči za koje se odgovoru dodaje sekcija "Šta sam uradio"
+_TECH_KEYWORDS = ('kod', 'code', 'program', 'script', 'github', 'analiza', 'debug', 'app', 'aplikacija')
+
+# Kratki pozdravi za koje nema smisla pokretati detektore komandi/modula/fajlova
+_TRIVIAL_INPUTS = frozenset({'hi', 'hej', 'cao', 'ćao', 'zdravo', 'hello', 'ok', 'okej', 'hvala', 'thanks'})
+
 # Optional sports modules (tsdb → sofascore → fudbal91)
 try:
     from ai_assistant.tsdb import search_team, events_next_team, events_last_team  # type: ignore
@@ -58,6 +405,96 @@ try:
 except Exception:
     plugins_pkg = None
 
+
+def _json_loads(raw):
+    """orjson.loads kad je dostupan, inače stdlib json (obe greške su json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(obj) -> bytes:
+    """orjson.dumps kad je dostupan (UTF-8 bajtovi), inače stdlib json."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+class OrjsonResponse(HttpResponse):
+    """JsonResponse ekvivalent koji serijalizuje preko _json_dumps."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(_json_dumps(data), **kwargs)
+
+
+def _payload(request):
+    """Parsira JSON telo zahteva jednom; prazno telo daje {}."""
+    return _json_loads(request.body) if request.body else {}
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_iso(value: str) -> datetime:
+    """datetime.fromisoformat sa kešom – polling task statusa stalno parsira iste stringove."""
+    return datetime.fromisoformat(value)
+
+
+# Legacy task_<epoch>[_sufiks] progres: simulacija traje 15s
+_LEGACY_TASK_DURATION = 15.0
+
+
+@functools.lru_cache(maxsize=4096)
+def _task_id_to_ts(task_id: str) -> Optional[float]:
+    """Vreme početka iz legacy task_id (sekunde ili milisekunde); None ako nije task_ id.
+    Neispravan broj baca ValueError (ne kešira se)."""
+    if not task_id or not task_id.startswith('task_'):
+        return None
+    # Deo posle 'task_' do prvog '_' (partition ne pravi listu)
+    ts = int(task_id.removeprefix('task_').partition('_')[0])
+    # Milisekunde imaju više od 10 cifara
+    return ts * 0.001 if ts > 10**10 else float(ts)
+
+
+_RATE_LIMIT_SWEEP_EVERY = 256
+# Stanje limitera je na nivou modula: Django pravi novu View instancu za svaki zahtev,
+# pa bi prozor na instanci uvek bio prazan. Deli se između niti workera – pristup pod lock-om
+_RATE_LIMIT_DATA = defaultdict(deque)
+_RATE_LIMIT_LOCK = threading.Lock()
+_rate_limit_calls = 0
+
+
+def _sliding_window_allow(session_id, max_requests, time_window):
+    """Klizni prozor po sesiji: deque vremena zahteva, izbacivanje sa leve strane (amortizovano O(1)).
+    Prazne sesije se čiste tek na svakih N poziva.
+    """
+    global _rate_limit_calls
+    now = time.monotonic()
+    with _RATE_LIMIT_LOCK:
+        _rate_limit_calls += 1
+        if _rate_limit_calls % _RATE_LIMIT_SWEEP_EVERY == 0:
+            for key in [k for k, dq in _RATE_LIMIT_DATA.items() if not dq or now - dq[-1] > time_window]:
+                del _RATE_LIMIT_DATA[key]
+
+        dq = _RATE_LIMIT_DATA[session_id]
+        while dq and now - dq[0] > time_window:
+            dq.popleft()
+        if len(dq) >= max_requests:
+            return False
+        dq.append(now)
+        return True
+
+
+def _success(now, ai_response, mode, **extra):
+    """Zajednički uspešan odgovor za DeepSeekAPI.post (timestamp/len računati jednom)."""
+    return JsonResponse({
+        'response': ai_response,
+        'status': 'success',
+        'timestamp': now.isoformat(),
+        'mode': mode,
+        'response_length': len(ai_response),
+        **extra
+    })
+
 class DeepSeekAPI(View):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -91,22 +528,86 @@ class DeepSeekAPI(View):
             return []
     
     def get_task_progress(self, task_id):
-        """Simple task progress tracking"""
+        """Task progress: heavy task-ovi iz task_processor-a, legacy task_<epoch> simulacija"""
         import time
         current_time = time.time()
         
-        # Simple progress simulation
+        # Check if it's a heavy task
+        if task_id and task_id.startswith('heavy_'):
+            try:
+                heavy_task_status = task_processor.get_task_status(task_id)
+                status = heavy_task_status['status']
+                
+                if status == 'not_found':
+                    return {'status': 'not_found', 'progress': 0}
+                
+                status_mapping = {
+                    'pending': 'running',
+                    'running': 'running', 
+                    'completed': 'completed',
+                    'failed': 'failed',
+                    'cancelled': 'cancelled',
+                    'retrying': 'running'
+                }
+                
+                mapped_status = status_mapping.get(status, 'running')
+                
+                if mapped_status == 'completed':
+                    result = heavy_task_status.get('result')
+                    result_text = (
+                        f"✅ **HEAVY TASK ZAVRŠEN**\n\n"
+                        f"Task ID: `{task_id}`\n"
+                        f"Status: Uspešno završen\n"
+                        f"Trajanje: {self.calculate_task_duration(heavy_task_status)}\n\n"
+                    )
+                    if result:
+                        result_text += f"**REZULTAT:**\n{self.format_heavy_task_result(result)}"
+                    
+                    return {
+                        'status': 'completed',
+                        'progress': 100,
+                        'result': result_text
+                    }
+                
+                elif mapped_status == 'failed':
+                    err = heavy_task_status.get('error', 'Nepoznata greška')
+                    retries = heavy_task_status.get('retry_count', 0)
+                    error_text = (
+                        f"❌ **HEAVY TASK NEUSPEŠAN**\n\n"
+                        f"Task ID: `{task_id}`\n"
+                        f"Greška: {err}\n"
+                        f"Pokušaji: {retries}\n"
+                    )
+                    
+                    return {
+                        'status': 'failed',
+                        'progress': 0,
+                        'result': error_text
+                    }
+                
+                else:
+                    return {
+                        'status': 'running',
+                        'progress': heavy_task_status.get('progress', 50)
+                    }
+            except Exception:
+                # Fallback for task processor errors
+                return {
+                    'status': 'running',
+                    'progress': 50,
+                    'result': None
+                }
+        
+        # Simple progress simulation (legacy task_ id)
         if task_id and task_id.startswith('task_'):
             try:
-                # Extract timestamp from task_id
-                timestamp_part = task_id.replace('task_', '').split('_')[0]
-                task_timestamp = int(timestamp_part) / 1000.0
+                # Extract timestamp from task_id (keširano; razume i sekunde i milisekunde)
+                task_timestamp = _task_id_to_ts(task_id)
                 
                 elapsed = current_time - task_timestamp
-                duration = 15.0
                 
-                if elapsed < duration:
-                    progress = int((elapsed / duration) * 100)
+                if elapsed < _LEGACY_TASK_DURATION:
+                    progress = int((elapsed / _LEGACY_TASK_DURATION) * 100)
                     progress = max(1, min(99, progress))
                     return {'status': 'running', 'progress': progress}
                 else:
@@ -128,26 +629,22 @@ class DeepSeekAPI(View):
             return False
 
     # --- Safe stub: heavy task detector used in post() flow
-    def is_heavy_task(self, user_input: str) -> bool:
+    def is_heavy_task(self, user_input: str, input_lower: Optional[str] = None) -> bool:
         """Lightweight heuristic to detect heavy tasks; safe default False."""
         try:
             if not user_input:
                 return False
-            text = user_input.lower()
-            keywords = ['analyze repo', 'code analysis', 'large file', 'process project', 'rollback', 'deploy']
-            return any(k in text for k in keywords)
+            return _HEAVY_STUB_RE.search(input_lower if input_lower is not None else user_input.lower()) is not None
         except Exception:
             return False
 
     # --- Safe stub: complex task detector expected by some UI flows
-    def is_complex_task(self, user_input: str) -> bool:
+    def is_complex_task(self, user_input: str, input_lower: Optional[str] = None) -> bool:
         """Heuristic for complex tasks; default False to keep UX stable."""
         try:
             if not user_input:
                 return False
-            text = user_input.lower()
-            patterns = ['kompleks', 'complex', 'plan', 'arhitekt', 'refactor', 'migrate', 'docker', 'kubernetes']
-            return any(p in text for p in patterns)
+            return _COMPLEX_STUB_RE.search(input_lower if input_lower is not None else user_input.lower()) is not None
         except Exception:
             return False
     
@@ -156,22 +653,9 @@ class DeepSeekAPI(View):
         Returns True when within limits, False if exceeded.
         """
         try:
-            import time
-            now = time.time()
             if not session_id:
                 return True
-            if not hasattr(self, '_rate_limit_data'):
-                self._rate_limit_data = {}
-            data = self._rate_limit_data.get(session_id)
-            if not data or (now - data.get('timestamp', 0) > time_window):
-                self._rate_limit_data[session_id] = {'count': 1, 'timestamp': now}
-                return True
-            if data['count'] >= max_requests:
-                return False
-            data['count'] += 1
-            data['timestamp'] = now
-            self._rate_limit_data[session_id] = data
-            return True
+            return _sliding_window_allow(session_id, max_requests, time_window)
         except Exception:
             # On any error, do not block user
             return True
@@ -186,18 +670,19 @@ class DeepSeekAPI(View):
             # Use last few user messages to add context
             if isinstance(conversation_history, list):
                 recent_messages = []
-                for msg in reversed(conversation_history[-6:]):
+                for msg in itertools.islice(reversed(conversation_history), 6):
                     try:
                         if msg.get('isUser') and msg.get('content') and msg.get('content') != original_query:
                             recent_messages.append(msg['content'])
+                            if len(recent_messages) == 2:
+                                break
                     except Exception:
                         continue
                 if recent_messages:
                     # Append as parentheses to keep search concise
                     context = ' (' + ' '.join(recent_messages[:2]) + ')'
             # Remove very common filler words
-            filler_words = {'molim', 'te', 'da', 'mi', 'kažeš', 'pomozi', 'sa', 'o'}
-            words = [w for w in query.split() if w.lower() not in filler_words and len(w) > 2]
+            words = [w for w in query.split() if len(w) > 2 and w.lower() not in _FILLER_WORDS]
             reformulated = ' '.join(words) + context
             # Limit length
             if len(reformulated) > 100:
@@ -206,6 +691,99 @@ class DeepSeekAPI(View):
         except Exception:
             return original_query or ''
         
+    def extract_code_from_input(self, user_input: str) -> str:
+        """Izvlači kod iz korisničkog unosa"""
+        # Traži kod između ``` blokova
+        code_blocks = _CODE_BLOCK_RE.findall(user_input)
+        if code_blocks:
+            return code_blocks[0]
+        
+        # Fallback - uzmi ceo input ako nema code blokova
+        return user_input
+    
+    def detect_programming_language(self, code: str) -> str:
+        """Detektuje programski jezik na osnovu koda"""
+        # Jedan prolaz kroz kod; među pronađenim jezicima pobeđuje onaj sa najvećim prioritetom
+        found = _scan_labels(_LANG_SCANNER, code.lower())
+        for lang in _LANG_PRIORITY:
+            if lang in found:
+                return lang
+        return 'text'
+    
+    def extract_file_path_from_input(self, user_input: str) -> str:
+        """Izvlači putanju fajla iz unosa"""
+        # Traži putanje u navodnicima
+        matches = _QUOTED_PATH_RE.findall(user_input)
+        if matches:
+            return matches[0]
+        
+        # Traži Windows putanje
+        matches = _WIN_PATH_RE.findall(user_input)
+        if matches:
+            return matches[0]
+        
+        return "unknown_file.txt"
+    
+    def extract_operation_from_input(self, user_input: str) -> str:
+        """Izvlači tip operacije iz unosa"""
+        input_lower = user_input.lower()
+        for operation, regex in _OPERATION_RES:
+            if regex.search(input_lower):
+                return operation
+        return 'process'
+    
+    def calculate_task_duration(self, task_status: Dict) -> str:
+        """Računa trajanje task-a"""
+        started_ts = task_status.get('started_ts')
+        completed_ts = task_status.get('completed_ts')
+        if started_ts is None or completed_ts is None:
+            # Stariji format statusa: samo ISO stringovi
+            if not task_status.get('started_at') or not task_status.get('completed_at'):
+                return "N/A"
+        
+        try:
+            if started_ts is not None and completed_ts is not None:
+                total_seconds = int(completed_ts - started_ts)
+            else:
+                started = _parse_iso(task_status['started_at'])
+                completed = _parse_iso(task_status['completed_at'])
+                total_seconds = int((completed - started).total_seconds())
+            if total_seconds < 60:
+                return f"{total_seconds} sekundi"
+            elif total_seconds < 3600:
+                minutes = total_seconds // 60
+                return f"{minutes} minuta"
+            else:
+                hours = total_seconds // 3600
+                minutes = (total_seconds % 3600) // 60
+                return f"{hours}h {minutes}m"
+        except:
+            return "N/A"
+    
+    def format_heavy_task_result(self, result: Any) -> str:
+        """Formatira rezultat heavy task-a za prikaz"""
+        if isinstance(result, dict):
+            return "".join([f"- **{key}**: {value}\n" for key, value in result.items()])
+        elif isinstance(result, list):
+            return "\n".join([f"- {item}" for item in result])
+        else:
+            return str(result)
+    
+    def identify_advanced_task_type(self, user_input):
+        """Advanced task type identification"""
+        # Jedan prolaz kroz unos; među pronađenim kategorijama pobeđuje ona sa najvećim prioritetom
+        found = _scan_labels(_TASK_CATEGORY_SCANNER, user_input.lower())
+        for category, _ in _TASK_CATEGORIES:
+            if category in found:
+                return category
+        return 'web_app'
+    
+    def create_and_execute_plan(self, user_input, user_context):
+        """Create comprehensive execution plan with best practices"""
+        task_type = self.identify_advanced_task_type(user_input)
+        
+        return _ADVANCED_PLANS.get(task_type, _ADVANCED_PLANS['web_app'])
+    
     def dispatch(self, request, *args, **kwargs):
         # Check authentication for API access
         if not request.session.get('authenticated'):
@@ -1295,28 +1873,284 @@ class DeepSeekAPI(View):
         except Exception as e:
             return f"Greška pri preuzimanju sportskih informacija: {str(e)}"
 
-    def post(self, request):
-        print("=== NESAKO AI POST METHOD ===")
+    def fallback_answer(self, user_input):
+        """Odgovor kada DeepSeek nije dostupan: web sinteza (osim small‑talk), pa NESAKO.
+        Vraća (ai_response, used_web).
+        """
+        used_web = False
+        if not self.is_smalltalk(user_input):
+            ai_response = self.synthesize_answer_from_web(user_input)
+            used_web = True
+        else:
+            ai_response = self.friendly_smalltalk_reply(user_input)
+        if not ai_response or 'nisam' in ai_response.lower():
+            ai_response = self.nesako.get_response(user_input)
+            used_web = False
+        return ai_response, used_web
+
+    def stream_deepseek(self, api_url, headers, payload, session_id, user_input, chat_id, tools_used=None, context_data=None):
+        """SSE generator: prosleđuje delta tokene DeepSeek-a klijentu čim stignu.
+        Ceo odgovor se čuva u memoriji tek kada se stream završi (ili prekine).
+        """
+        parts = []
         try:
-            print(f"Request body: {request.body}")
-            print(f"Content type: {request.content_type}")
-            
-            # Handle multipart/form-data for image uploads
-            if request.content_type and 'multipart/form-data' in request.content_type:
-                return self.handle_image_upload(request)
+            # with: konekcija se vraća u pool i kad klijent prekine stream (GeneratorExit) ili pukne izuzetak
+            with _deepseek_session().post(api_url, headers=headers, data=_json_dumps(payload), stream=True, timeout=DEEPSEEK_STREAM_TIMEOUT) as r:
+                if r.status_code != 200:
+                    yield f"data: {json.dumps({'error': f'DeepSeek status {r.status_code}'})}\n\n"
+                    return
+                for line in r.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data: '):
+                        continue
+                    chunk = line[6:]
+                    if chunk == '[DONE]':
+                        break
+                    try:
+                        delta = _json_loads(chunk)['choices'][0].get('delta', {}).get('content')
+                    except (ValueError, KeyError, IndexError):
+                        continue
+                    if delta:
+                        parts.append(delta)
+                        yield f"data: {json.dumps({'delta': delta}, ensure_ascii=False)}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            logger.warning("DeepSeek stream error: %s", e)
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            ai_response = ''.join(parts)
+            if ai_response:
+                try:
+                    self.memory.save_conversation(
+                        session_id=session_id,
+                        user_message=user_input,
+                        ai_response=ai_response,
+                        chat_id=chat_id,
+                        tools_used=tools_used or [],
+                        context_data=dict(context_data or {}, stream=True)
+                    )
+                except Exception:
+                    logger.exception("Stream persistence error")
+
+    @staticmethod
+    def sse_response(generator):
+        """Omotava SSE generator u StreamingHttpResponse bez baferovanja na proxy-ju (Render/nginx)."""
+        stream = StreamingHttpResponse(generator, content_type='text/event-stream')
+        stream['Cache-Control'] = 'no-cache'
+        stream['X-Accel-Buffering'] = 'no'
+        return stream
+
+    def handle_image_upload(self, request):
+        """Obrađuje upload slika"""
+        try:
+            logger.debug("=== IMAGE UPLOAD DETECTED ===")
             
-            # Improved JSON parsing with error handling
-            try:
-                data = json.loads(request.body)
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                return JsonResponse({
-                    'error': 'Invalid JSON format',
+            # Get uploaded files
+            uploaded_files = request.FILES.getlist('images')
+            if not uploaded_files:
+                return OrjsonResponse({
+                    'error': 'Nema upload-ovanih slika',
                     'status': 'error',
-                    'response': 'Greška u parsiranju zahteva. Molim pokušajte ponovo.'
+                    'response': 'Molim upload-ujte sliku za analizu.'
                 }, status=400)
             
-            # Add request validation
+            # Bez API ključa nema analize – ne trošimo PIL obradu uzalud
+            if DEEPSEEK_HEADERS is None:
+                return OrjsonResponse({
+                    'error': 'DeepSeek API key nije konfigurisan',
+                    'status': 'error'
+                }, status=500)
+            
+            # Get text instruction if provided
+            user_instruction = request.POST.get('instruction', '').strip()
+            
+            # Process each image
+            processed_images = []
+            image_descriptions = []
+            
+            # Obradi slike paralelno, direktno iz upload fajlova (redosled ostaje kao u upload-u)
+            files = [(f.name, f) for f in uploaded_files[:3]]  # Limit to 3 images
+            futures = [_IMAGE_POOL.submit(_process_one_image, self.image_processor, name, f) for name, f in files]
+            results = [future.result() for future in futures]
+            
+            for (name, _), result in zip(files, results):
+                logger.debug("Processing image: %s", name)
+                if result.get('success'):
+                    processed_images.append({
+                        'filename': name,
+                        'info': result['image_info'],
+                        'analysis': result['analysis']
+                    })
+                    image_descriptions.append(f"📸 {name}: {result['description']}")
+                else:
+                    return OrjsonResponse({
+                        'error': result['error'],
+                        'status': 'error',
+                        'response': f'Greška pri obradi slike {name}: {result["error"]}'
+                    }, status=400)
+            
+            # Create AI prompt with image analysis
+            image_context = "\n".join(image_descriptions)
+            
+            if user_instruction:
+                combined_prompt = ''.join((_PROMPT_WITH_INSTR[0], image_context, _PROMPT_WITH_INSTR[1], user_instruction, _PROMPT_WITH_INSTR[2]))
+            else:
+                combined_prompt = ''.join((_PROMPT_NO_INSTR[0], image_context, _PROMPT_NO_INSTR[1]))
+            
+            # Get session ID for memory
+            session_id = request.session.session_key
+            if not session_id:
+                request.session.save()
+                session_id = request.session.session_key
+            
+            # Konverzacija se upisuje jednom, tek kada stigne odgovor (nema placeholder reda)
+            upload_message = f"Upload slika: {', '.join([f.name for f in uploaded_files])} - {user_instruction}"
+            
+            # Call DeepSeek API with image analysis
+            API_URL = DEEPSEEK_URL
+            
+            headers = DEEPSEEK_HEADERS
+            
+            # Get current time
+            current_time, current_time_str, current_date, day_serbian = cached_time()
+            
+            system_message = _IMAGE_SYSTEM_TMPL.format(t=current_time_str, d=day_serbian, date=current_date)
+
+            payload = {
+                'model': 'deepseek-chat',
+                'messages': [
+                    {'role': 'system', 'content': system_message},
+                    {'role': 'user', 'content': combined_prompt}
+                ],
+                'temperature': 0.4,
+                'top_p': 0.9,
+                # Samo slike bez zahteva retko traže dug odgovor – manji budžet = brži odgovor
+                'max_tokens': _IMAGE_MAX_TOKENS if user_instruction else _IMAGE_ONLY_MAX_TOKENS,
+                'stream': False
+            }
+            
+            # Opcioni SSE streaming (?stream=1); podrazumevano ostaje JSON ugovor ispod
+            if request.GET.get('stream') == '1':
+                payload['stream'] = True
+                return self.sse_response(self.stream_deepseek(
+                    API_URL, headers, payload, session_id,
+                    upload_message,
+                    None,
+                    tools_used=['image_processing', 'ai_analysis'],
+                    context_data={
+                        'images_processed': len(processed_images),
+                        'image_details': [img['info'] for img in processed_images]
+                    }
+                ))
+            
+            try:
+                response = _deepseek_session().post(API_URL, data=_json_dumps(payload), timeout=DEEPSEEK_TIMEOUT)
+                
+                if response.status_code == 200:
+                    result = _json_loads(response.content)
+                    ai_response = result['choices'][0]['message']['content']
+                    
+                    # Update memory with final response (u pozadini, posle slanja odgovora)
+                    _BG.submit(
+                        _save_conversation_bg, self.memory,
+                        session_id=session_id,
+                        user_message=upload_message,
+                        ai_response=ai_response,
+                        tools_used=['image_processing', 'ai_analysis'],
+                        context_data={
+                            'images_processed': len(processed_images),
+                            'image_details': [img['info'] for img in processed_images]
+                        }
+                    )
+                    
+                    return OrjsonResponse({
+                        'response': ai_response,
+                        'status': 'success',
+                        'timestamp': current_time.isoformat(),
+                        'mode': 'image_analysis',
+                        'images_processed': len(processed_images),
+                        'image_data': processed_images,
+                        'tools_used': True
+                    })
+                else:
+                    # Fallback response when API fails
+                    fallback_response = self.generate_fallback_image_response(processed_images, user_instruction)
+                    
+                    return OrjsonResponse({
+                        'response': fallback_response,
+                        'status': 'success',
+                        'timestamp': current_time.isoformat(),
+                        'mode': 'image_analysis_fallback',
+                        'images_processed': len(processed_images),
+                        'image_data': processed_images,
+                        'tools_used': True,
+                        'note': 'Fallback response used due to API error'
+                    })
+                    
+            except Exception as e:
+                logger.warning("Image upload error: %s", e)
+                return OrjsonResponse({
+                    'error': f'Greška pri upload-u: {str(e)}',
+                    'status': 'error',
+                    'response': 'Greška pri obradi upload-ovanih slika.'
+                }, status=500)
+
+        except Exception as e:
+            # Catch-all for outer try block
+            logger.warning("Image upload outer error: %s", e)
+            return OrjsonResponse({
+                'error': f'Neočekivana greška pri obradi slika: {str(e)}',
+                'status': 'error',
+                'response': 'Došlo je do neočekivane greške pri obradi upload-ovanih slika.'
+            }, status=500)
+
+    def generate_fallback_image_response(self, processed_images, user_instruction):
+        """Generate fallback response when AI API is unavailable"""
+        # Sekcije se spajaju praznim redom, linije unutar sekcije sa \n
+        sections = list(_IMAGE_FALLBACK_HEADER)
+        
+        for img in processed_images:
+            info = img['info']
+            lines = [
+                f"**{img['filename']}:**",
+                f"  • Format: {info.get('format', 'Nepoznato')}",
+                f"  • Dimenzije: {info.get('width', 0)}x{info.get('height', 0)}",
+                f"  • Veličina: {info.get('size_kb', 0)} KB",
+            ]
+            if 'color_mode' in info:
+                lines.append(f"  • Boje: {info['color_mode']}")
+            if 'analysis' in img and 'estimated_type' in img['analysis']:
+                lines.append(f"  • Tip: {img['analysis']['estimated_type']}")
+            sections.append("\n".join(lines))
+        
+        if user_instruction:
+            sections.append(f"**Vaš zahtev:** {user_instruction}")
+            sections.append("ℹ️ *Za detaljniju analizu, molim pokušajte ponovo kada AI servis bude dostupan*")
+        else:
+            sections.append("ℹ️ *Za detaljnu AI analizu, molim pokušajte ponovo kasnije*")
+        
+        return "\n\n".join(sections)
+
+    def post(self, request):
+        logger.debug("=== NESAKO AI POST METHOD ===")
+        try:
+            logger.debug("Content type: %s, body size: %d", request.content_type, len(request.body))
+            
+            # Handle multipart/form-data for image uploads
+            if request.content_type and 'multipart/form-data' in request.content_type:
+                return self.handle_image_upload(request)
+            
+            # Improved JSON parsing with error handling
+            try:
+                data = _json_loads(request.body)
+            except json.JSONDecodeError as e:
+                print(f"JSON decode error: {e}")
+                return JsonResponse({
+                    'error': 'Invalid JSON format',
+                    'status': 'error',
+                    'response': 'Greška u parsiranju zahteva. Molim pokušajte ponovo.'
+                }, status=400)
+            
+            # Add request validation
             if not isinstance(data, dict):
                 return JsonResponse({
                     'error': 'Invalid request format',
@@ -1332,18 +2166,18 @@ class DeepSeekAPI(View):
                 or ''
             )
             user_input = user_input.strip()
+            input_lower = user_input.lower()
+            need_tech_explanation = any(k in input_lower for k in _TECH_KEYWORDS)
             conversation_history = data.get('conversation_history', [])
             task_id = data.get('task_id', None)
             
-            print(f"User input: '{user_input}'")
-            print(f"Task ID: {task_id}")
-            print(f"History length: {len(conversation_history)}")
+            logger.debug("User input: %r, task_id: %s, history length: %d", user_input, task_id, len(conversation_history))
             
             # Handle task progress polling (empty instruction with task_id)
             if task_id and not user_input:
-                print(f"DEBUG: Polling progress for task_id: {task_id}")
+                logger.debug("Polling progress for task_id: %s", task_id)
                 progress = self.get_task_progress(task_id)
-                print(f"DEBUG: Progress result: {progress}")
+                logger.debug("Progress result: %s", progress)
                 if progress['status'] == 'completed':
                     return JsonResponse({
                         'response': f"✅ Zadatak završen!\n\n{progress['result']}",
@@ -1530,7 +2364,7 @@ class DeepSeekAPI(View):
 
             # --- Self-upgrade confirmation flow (prompt -> 'da' applies -> 'ponisti' reverts) ---
             try:
-                text_cmd = (user_input or '').strip().lower()
+                text_cmd = input_lower
                 pending = bool(request.session.get('upgrade_pending', False))
 
                 # Detect self-modification style requests to avoid routing into sports handlers
@@ -1562,7 +2396,7 @@ class DeepSeekAPI(View):
                                 key = v
                                 break
                         # Always use today's date when user asks 'danas/večeras/today' else default to today for UCL to avoid stale lists
-                        tz = pytz.timezone('Europe/Belgrade')
+                        tz = BELGRADE_TZ
                         today_str = datetime.now(tz).strftime('%Y-%m-%d')
                         date_str = today_str if any(k in text_cmd for k in ['danas','večeras','veceras','today']) or (key == 'ucl') else None
                         # Strict verify: exact=True and no web fallback here
@@ -1693,7 +2527,7 @@ class DeepSeekAPI(View):
 
             # --- Sports router: SofaScore as primary (fixtures), Fudbal91 as optional odds enrichment ---
             try:
-                text_lc = (user_input or '').lower()
+                text_lc = input_lower
                 
                 # ALIAS MAPPING (pojačano)
                 alias_map = {
@@ -1761,7 +2595,7 @@ class DeepSeekAPI(View):
                             agg = aggregate_verify(team=None, key='ucl', date=None, hours=None, exact=True, nocache=True, debug=False)
                             # Format
                             lines = ["Liga šampiona"]
-                            tz = pytz.timezone('Europe/Belgrade')
+                            tz = BELGRADE_TZ
                             for r in (agg.get('results') or [])[:20]:
                                 ko = r.get('kickoff') or ''
                                 try:
@@ -1796,11 +2630,11 @@ class DeepSeekAPI(View):
                             team_q = ' '.join(team_candidates[:2])
                             date_str = None
                             if any(k in normalized_query for k in ['danas','večeras','veceras','today']):
-                                date_str = datetime.now(pytz.timezone('Europe/Belgrade')).strftime('%Y-%m-%d')
+                                date_str = datetime.now(BELGRADE_TZ).strftime('%Y-%m-%d')
                             agg = aggregate_verify(team=team_q, key=chosen_key, date=date_str, hours=None, exact=False, nocache=True, debug=False)
                             # Format timski
                             lines = [f"Tim: {team_q}"]
-                            tz = pytz.timezone('Europe/Belgrade')
+                            tz = BELGRADE_TZ
                             for r in (agg.get('results') or [])[:20]:
                                 ko = r.get('kickoff') or ''
                                 try:
@@ -1980,9 +2814,6 @@ class DeepSeekAPI(View):
             except Exception as e:
                 print(f"Module auto-load error: {e}")
             
-            # Load conversation history from persistent memory
-            persistent_history = self.memory.get_conversation_history(session_id, limit=20)
-            
             # Load user learning profile from memory
             user_context = self.memory.get_learning_profile(session_id)
             
@@ -2009,11 +2840,11 @@ class DeepSeekAPI(View):
                 print(f"Sports detection error: {e}")
             
             # Heavy task detection and processing
-            if self.is_heavy_task(user_input):
-                heavy_task_id = f"heavy_{int(datetime.now().timestamp())}"
+            if self.is_heavy_task(user_input, input_lower):
+                heavy_task_id = f"heavy_{secrets.token_hex(8)}"
                 
                 # Determine task type and create appropriate heavy task
-                if any(word in user_input.lower() for word in ['analiziraj kod', 'code analysis', 'optimize code']):
+                if any(word in input_lower for word in ['analiziraj kod', 'code analysis', 'optimize code']):
                     # Extract code from input (simplified)
                     code_content = self.extract_code_from_input(user_input)
                     language = self.detect_programming_language(code_content)
@@ -2027,7 +2858,7 @@ class DeepSeekAPI(View):
                         'task_type': 'code_analysis'
                     })
                 
-                elif any(word in user_input.lower() for word in ['procesiraj fajl', 'process file', 'analyze file']):
+                elif any(word in input_lower for word in ['procesiraj fajl', 'process file', 'analyze file']):
                     # File processing task
                     file_path = self.extract_file_path_from_input(user_input)
                     operation = self.extract_operation_from_input(user_input)
@@ -2042,10 +2873,11 @@ class DeepSeekAPI(View):
                     })
             
             # Autonomous execution - DIREKTNO bez pitanja
-            if self.is_complex_task(user_input):
+            if self.is_complex_task(user_input, input_lower):
                 plan = self.create_and_execute_plan(user_input, user_context)
                 # Direktno kreiranje task_id i početak izvršavanja
-                new_task_id = f"task_{int(datetime.now().timestamp())}"
+                # Prefiks ostaje vreme početka (čita ga get_task_progress), nasumični sufiks sprečava koliziju
+                new_task_id = f"task_{int(time.time())}_{secrets.token_hex(4)}"
                 
                 # Save task to memory
                 self.memory.save_task(new_task_id, user_input, 'executing')
@@ -2058,26 +2890,19 @@ class DeepSeekAPI(View):
                 })
 
             # Trenutno vreme
-            belgrade_tz = pytz.timezone('Europe/Belgrade')
-            current_time = datetime.now(belgrade_tz)
-            current_date = current_time.strftime("%d.%m.%Y")
-            current_time_str = current_time.strftime("%H:%M")
-            day_of_week = current_time.strftime("%A")
-            
-            days_serbian = {
-                'Monday': 'ponedeljak', 'Tuesday': 'utorak', 'Wednesday': 'sreda',
-                'Thursday': 'četvrtak', 'Friday': 'petak', 'Saturday': 'subota', 'Sunday': 'nedelja'
-            }
-            day_serbian = days_serbian.get(day_of_week, day_of_week)
+            current_time, current_time_str, current_date, day_serbian = cached_time()
             
+            # Detektori se preskaču za trivijalne pozdrave (nijedna ključna reč ne može da se poklopi)
+            run_detectors = input_lower.strip(' !?.,') not in _TRIVIAL_INPUTS
+
             # Command generation detection
-            command_result = self.command_generator.generate_commands(user_input)
+            command_result = self.command_generator.generate_commands(user_input) if run_detectors else {'success': False}
             command_output = ""
             if command_result['success']:
                 command_output = self.command_generator.format_commands_for_display(command_result)
             
             # Module detection and execution
-            module_request = self.module_manager.detect_module_request(user_input)
+            module_request = self.module_manager.detect_module_request(user_input) if run_detectors else {'has_module_request': False}
             module_output = ""
             if module_request['has_module_request']:
                 # Auto-create modules if they don't exist
@@ -2096,7 +2921,7 @@ class DeepSeekAPI(View):
                         module_output += f"🤖 **{module_name.upper()} MODUL AKTIVAN**\n"
             
             # File operations detection and execution
-            file_request = self.file_operations.detect_file_operation_request(user_input)
+            file_request = self.file_operations.detect_file_operation_request(user_input) if run_detectors else {'has_file_operation': False}
             file_output = ""
             if file_request['has_file_operation']:
                 file_output += "📁 **FILE OPERACIJE DETEKTOVANE:**\n"
@@ -2104,17 +2929,18 @@ class DeepSeekAPI(View):
                     file_output += f"✅ {operation['operation']} - Confidence: {operation['confidence']}\n"
             
             # Tool detection i izvršavanje
-            tools_output = self.detect_and_execute_tools(user_input)
+            # Alati reaguju samo na GitHub URL ili JSON "tool" poziv
+            tools_output = self.detect_and_execute_tools(user_input) if ('github.com' in user_input or '"tool"' in user_input) else ""
             
             # Postojeći data fetching
             additional_data = ""
             
-            if any(word in user_input.lower() for word in ['vreme', 'temperatura', 'kiša', 'sunce', 'oblačno']):
+            if any(word in input_lower for word in ['vreme', 'temperatura', 'kiša', 'sunce', 'oblačno']):
                 weather = self.get_weather_data()
                 if weather:
                     additional_data += f"\nTRENUTNO VREME U BEOGRADU: {weather['temperature']}°C, {weather['description']}, vlažnost {weather['humidity']}%"
             
-            if any(word in user_input.lower() for word in ['vesti', 'novosti', 'dešavanja', 'aktuelno']):
+            if any(word in input_lower for word in ['vesti', 'novosti', 'dešavanja', 'aktuelno']):
                 news = self.get_news_data()
                 if news:
                     additional_data += "\nNAJNOVIJE VESTI:\n"
@@ -2124,14 +2950,20 @@ class DeepSeekAPI(View):
             serp_snippets = []
             
             # Enhanced web search with AI query reformulation
-            if any(word in user_input.lower() for word in ['pretraži', 'pronađi', 'informacije o', 'šta je', 'rezultat', 'utakmica', 'danas', 'sada', 'istraži', 'web']):
+            if any(word in input_lower for word in ['pretraži', 'pronađi', 'informacije o', 'šta je', 'rezultat', 'utakmica', 'danas', 'sada', 'istraži', 'web']):
                 try:
                     # First, use AI to reformulate the query for better search results
                     reformulated_query = self.reformulate_search_query(user_input, conversation_history)
                     print(f"Original query: '{user_input}' -> Reformulated: '{reformulated_query}'")
                     
-                    # Search with the reformulated query
-                    serp_snippets = self.nesako.search_web(reformulated_query)
+                    # Search with the reformulated query (keširano da isti upit ne bi ponovo išao na SerpAPI)
+                    serp_key = 'serp:' + hashlib.blake2b(reformulated_query.encode('utf-8'), digest_size=12).hexdigest()
+                    serp_snippets = cache.get(serp_key)
+                    if serp_snippets is None:
+                        serp_snippets = self.nesako.search_web(reformulated_query)
+                        if serp_snippets:
+                            ttl = SERP_CACHE_TTL_LIVE if any(w in input_lower for w in _LIVE_QUERY_WORDS) else SERP_CACHE_TTL
+                            cache.set(serp_key, serp_snippets, ttl)
                     if serp_snippets:
                         additional_data += f"\n🔍 **INFORMACIJE SA WEBA (pretraga: \"{reformulated_query}\"):**\n\n"
                         for i, snippet in enumerate(serp_snippets[:5], 1):  # Limit to 5 results
@@ -2148,7 +2980,7 @@ class DeepSeekAPI(View):
                     additional_data += "\n⚠️ Greška pri web pretrazi. Molim pokušajte ponovo.\n"
             
             # NESAKO centralno rutiranje za sportska pitanja (obavezna web pretraga)
-            if any(keyword in user_input.lower() for keyword in getattr(self.nesako, 'sports_keywords', [])):
+            if any(keyword in input_lower for keyword in getattr(self.nesako, 'sports_keywords', [])):
                 try:
                     ai_response = self.nesako.get_response(user_input)
                 except Exception as e:
@@ -2163,7 +2995,7 @@ class DeepSeekAPI(View):
                     print(f"NESAKO persistence error (sports): {e}")
 
                 # Sačuvaj u persistent memory
-                chat_id = data.get('chat_id', f"chat_{int(datetime.now().timestamp())}")
+                chat_id = data.get('chat_id') or f"chat_{secrets.token_hex(8)}"
                 tools_list = []
                 if serp_snippets:
                     tools_list.append('serpapi_search')
@@ -2184,49 +3016,41 @@ class DeepSeekAPI(View):
                 )
 
                 # Dodaj objašnjenje ako je tehničko pitanje
-                if any(keyword in user_input.lower() for keyword in ['kod', 'code', 'program', 'script', 'github', 'analiza', 'debug', 'app', 'aplikacija']):
+                if need_tech_explanation:
                     if not ai_response.endswith('## 🔧 Šta sam uradio:'):
                         explanation = self.generate_task_explanation(user_input, tools_output)
                         ai_response += f"\n\n## 🔧 Šta sam uradio:\n{explanation}"
 
-                return JsonResponse({
-                    'response': ai_response,
-                    'status': 'success',
-                    'timestamp': current_time.isoformat(),
-                    'mode': 'definitivni_asistent',
-                    'tools_used': bool(tools_output or serp_snippets),
-                    'context_aware': False,
-                    'response_length': len(ai_response),
-                    'conversation_id': conversation_id,
-                    'memory_active': True
-                })
+                return _success(
+                    current_time, ai_response, 'definitivni_asistent',
+                    tools_used=bool(tools_output or serp_snippets),
+                    context_aware=False,
+                    conversation_id=conversation_id,
+                    memory_active=True
+                )
             
             # Conversation context
             context_summary = ""
             if conversation_history:
-                recent_topics = []
-                for msg in conversation_history[-5:]:  # Last 5 messages
-                    if msg.get('isUser'):
-                        content = msg.get('content', '')[:100]
-                        recent_topics.append(content)
-                
+                # Last 5 messages, bez kopiranja liste
+                recent_topics = [
+                    msg.get('content', '')[:100]
+                    for msg in itertools.islice(reversed(conversation_history), 5)
+                    if msg.get('isUser')
+                ]
                 if recent_topics:
-                    context_summary = f"\nKONTEKST RAZGOVORA:\nPoslednje teme: {' | '.join(recent_topics)}"
+                    context_summary = f"\nKONTEKST RAZGOVORA:\nPoslednje teme: {' | '.join(reversed(recent_topics))}"
             
             # DeepSeek API
-            API_URL = "https://api.deepseek.com/v1/chat/completions"
-            API_KEY = os.environ.get('DEEPSEEK_API_KEY')
+            API_URL = DEEPSEEK_URL
             
-            if not API_KEY:
+            if DEEPSEEK_HEADERS is None:
                 return JsonResponse({
                     'error': 'DeepSeek API key nije konfigurisan',
                     'status': 'error'
                 }, status=500)
             
-            headers = {
-                "Authorization": f"Bearer {API_KEY}",
-                "Content-Type": "application/json"
-            }
+            headers = DEEPSEEK_HEADERS
             
             # Enhanced system message with transparent GitHub capabilities
             system_message = f"""Ti si NESAKO AI - ULTIMATIVNI ASISTENT sa pravim GitHub integracijama.
@@ -2280,22 +3104,25 @@ TRENUTNO VREME: {current_time_str}, {day_serbian}, {current_date}
                 'stream': False
             }
             
-            print(f"Sending request to DeepSeek API...")
-            print(f"Payload size: {len(str(payload))}")
+            logger.debug("Sending request to DeepSeek API (%d messages)", len(payload['messages']))
+
+            # Opcioni SSE streaming (?stream=1) – drugačiji oblik odgovora od JSON-a ispod
+            if request.GET.get('stream') == '1':
+                payload['stream'] = True
+                chat_id = data.get('chat_id') or f"chat_{secrets.token_hex(8)}"
+                return self.sse_response(self.stream_deepseek(API_URL, headers, payload, session_id, user_input, chat_id))
             
             try:
-                response = requests.post(
+                response = _deepseek_session().post(
                     API_URL,
-                    headers=headers,
-                    json=payload,
-                    timeout=60
+                    data=_json_dumps(payload),
+                    timeout=DEEPSEEK_TIMEOUT
                 )
                 
-                print(f"DeepSeek response status: {response.status_code}")
-                print(f"Response headers: {response.headers}")
+                logger.debug("DeepSeek response status: %s", response.status_code)
                 
                 if response.status_code == 200:
-                    result = response.json()
+                    result = _json_loads(response.content)
                     
                     # Validate response structure
                     if 'choices' not in result or not result['choices']:
@@ -2333,7 +3160,7 @@ TRENUTNO VREME: {current_time_str}, {day_serbian}, {current_date}
                         self.nesako.memory.store_conversation(user_input, ai_response)
                         self.nesako.learn_from_conversation(user_input, ai_response)
                         # Ako korisnik daje uputstvo/pravilo, sačuvaj kao LessonLearned
-                        if any(p in user_input.lower() for p in ['zapamti', 'nikad', 'uvek', 'nemoj']):
+                        if any(p in input_lower for p in ['zapamti', 'nikad', 'uvek', 'nemoj']):
                             try:
                                 LessonLearned.objects.create(lesson_text=user_input, source='conversation', user=str(request.session.get('user', 'private')))
                             except Exception:
@@ -2342,7 +3169,7 @@ TRENUTNO VREME: {current_time_str}, {day_serbian}, {current_date}
                         print(f"NESAKO ORM persistence error: {e}")
 
                     # Save conversation to persistent memory
-                    chat_id = data.get('chat_id', f"chat_{int(datetime.now().timestamp())}")
+                    chat_id = data.get('chat_id') or f"chat_{secrets.token_hex(8)}"
                     tools_list = []
                     if tools_output:
                         tools_list = ['web_content', 'github_content', 'code_analysis', 'sports_stats', 'code_execution']
@@ -2363,7 +3190,7 @@ TRENUTNO VREME: {current_time_str}, {day_serbian}, {current_date}
                     )
                     
                     # Add explanation for complex tasks
-                    if any(keyword in user_input.lower() for keyword in ['kod', 'code', 'program', 'script', 'github', 'analiza', 'debug', 'app', 'aplikacija']):
+                    if need_tech_explanation:
                         if not ai_response.endswith('## 🔧 Šta sam uradio:'):
                             explanation = self.generate_task_explanation(user_input, tools_output)
                             ai_response += f"\n\n## 🔧 Šta sam uradio:\n{explanation}"
@@ -2374,113 +3201,50 @@ TRENUTNO VREME: {current_time_str}, {day_serbian}, {current_date}
                     except Exception as e:
                         print(f"Lessons save (success path) error: {e}")
 
-                    return JsonResponse({
-                        'response': ai_response,
-                        'status': 'success',
-                        'timestamp': current_time.isoformat(),
-                        'mode': 'definitivni_asistent',
-                        'tools_used': bool(tools_output),
-                        'context_aware': bool(context_summary),
-                        'response_length': len(ai_response),
-                        'conversation_id': conversation_id,
-                        'memory_active': True,
-                        'used_web_synthesis': used_web
-                    })
+                    return _success(
+                        current_time, ai_response, 'definitivni_asistent',
+                        tools_used=bool(tools_output),
+                        context_aware=bool(context_summary),
+                        conversation_id=conversation_id,
+                        memory_active=True,
+                        used_web_synthesis=used_web
+                    )
                 else:
                     # Fallback: pokušaj web sintezu pre NESAKO (osim small‑talk)
                     print("DeepSeek API failed, using web synthesis fallback")
-                    used_web = False
-                    if not self.is_smalltalk(user_input):
-                        ai_response = self.synthesize_answer_from_web(user_input)
-                        used_web = True
-                    else:
-                        ai_response = self.friendly_smalltalk_reply(user_input)
-                    if not ai_response or 'nisam' in ai_response.lower():
-                        ai_response = self.nesako.get_response(user_input)
-                        used_web = False
+                    ai_response, used_web = self.fallback_answer(user_input)
                     # Add context from tools and additional data
                     if additional_data:
                         ai_response = f"{additional_data}\n\n{ai_response}"
                     if tools_output:
                         ai_response = f"{tools_output}\n\n{ai_response}"
-                    return JsonResponse({
-                        'response': ai_response,
-                        'status': 'success',
-                        'timestamp': current_time.isoformat(),
-                        'mode': 'web_synthesis' if used_web else 'nesako_fallback',
-                        'tools_used': bool(tools_output),
-                        'context_aware': bool(context_summary),
-                        'response_length': len(ai_response),
-                        'note': 'Fallback used due to API error',
-                        'used_web_synthesis': used_web
-                    })
+                    return _success(
+                        current_time, ai_response,
+                        'web_synthesis' if used_web else 'nesako_fallback',
+                        tools_used=bool(tools_output),
+                        context_aware=bool(context_summary),
+                        note='Fallback used due to API error',
+                        used_web_synthesis=used_web
+                    )
                     
-            except requests.exceptions.Timeout:
-                print("ERROR: API request timeout - using web synthesis fallback")
-                if not self.is_smalltalk(user_input):
-                    ai_response = self.synthesize_answer_from_web(user_input)
-                    used_web = True
-                else:
-                    ai_response = self.friendly_smalltalk_reply(user_input)
-                    used_web = False
-                if not ai_response or 'nisam' in ai_response.lower():
-                    ai_response = self.nesako.get_response(user_input)
-                    used_web = False
-                return JsonResponse({
-                    'response': ai_response,
-                    'status': 'success',
-                    'timestamp': current_time.isoformat(),
-                    'mode': 'web_synthesis_timeout' if used_web else 'nesako_fallback_timeout',
-                    'note': 'Fallback used due to API timeout',
-                    'used_web_synthesis': used_web
-                })
-                
-            except requests.exceptions.ConnectionError:
-                print("ERROR: API connection error - using web synthesis fallback")
-                if not self.is_smalltalk(user_input):
-                    ai_response = self.synthesize_answer_from_web(user_input)
-                    used_web = True
-                else:
-                    ai_response = self.friendly_smalltalk_reply(user_input)
-                    used_web = False
-                if not ai_response or 'nisam' in ai_response.lower():
-                    ai_response = self.nesako.get_response(user_input)
-                    used_web = False
-                return JsonResponse({
-                    'response': ai_response,
-                    'status': 'success',
-                    'timestamp': current_time.isoformat(),
-                    'mode': 'web_synthesis_connection' if used_web else 'nesako_fallback_connection',
-                    'note': 'Fallback used due to connection error',
-                    'used_web_synthesis': used_web
-                })
-                
             except Exception as api_error:
-                print(f"ERROR: Unexpected API error: {api_error} - using web synthesis fallback")
-                if not self.is_smalltalk(user_input):
-                    ai_response = self.synthesize_answer_from_web(user_input)
-                    used_web = True
-                else:
-                    ai_response = self.friendly_smalltalk_reply(user_input)
-                    used_web = False
-                if not ai_response or 'nisam' in ai_response.lower():
-                    ai_response = self.nesako.get_response(user_input)
-                    used_web = False
+                # Jedan handler za timeout / konekciju / ostale greške – razlikuju se samo mode i napomena
+                suffix, note = _api_error_mode(api_error)
+                logger.warning("DeepSeek API %s: %s - using web synthesis fallback", suffix, api_error)
+                ai_response, used_web = self.fallback_answer(user_input)
                 # Add context from tools and additional data for consistency
                 if additional_data:
                     ai_response = f"{additional_data}\n\n{ai_response}"
                 if tools_output:
                     ai_response = f"{tools_output}\n\n{ai_response}"
-                return JsonResponse({
-                    'response': ai_response,
-                    'status': 'success',
-                    'timestamp': current_time.isoformat(),
-                    'mode': 'web_synthesis_error' if used_web else 'nesako_fallback_error',
-                    'tools_used': bool(tools_output),
-                    'context_aware': bool(context_summary),
-                    'note': f'Fallback used due to API error: {str(api_error)}',
-                    'used_web_synthesis': used_web
-                })
+                return _success(
+                    current_time, ai_response,
+                    f"{'web_synthesis' if used_web else 'nesako_fallback'}_{suffix}",
+                    tools_used=bool(tools_output),
+                    context_aware=bool(context_summary),
+                    note=note,
+                    used_web_synthesis=used_web
+                )
                 
         except json.JSONDecodeError as e:
             print(f"JSON error: {e}")
@@ -2512,7 +3276,7 @@ def preferences_view(request):
         enabled = None
         if request.content_type and 'application/json' in request.content_type:
             try:
-                data = json.loads(request.body or '{}')
+                data = _payload(request)
                 enabled = data.get('auto_modules_enabled', None)
             except Exception:
                 enabled = None
@@ -2534,8 +3298,8 @@ def preferences_view(request):
 @require_http_methods(["POST"])
 def github_create_branch(request):
     try:
-        import os, base64, json
-        data = json.loads(request.body or '{}')
+        import os, base64
+        data = _payload(request)
         repo = data.get('repo', '')  # owner/repo or full URL
         base = data.get('base', 'main')
         new_branch = data.get('branch')
@@ -2573,8 +3337,8 @@ def github_commit_file(request):
     Body: {repo, branch, path, content_base64, message}
     """
     try:
-        import os, json
-        data = json.loads(request.body or '{}')
+        import os
+        data = _payload(request)
         repo = data.get('repo','')
         branch = data.get('branch','main')
         path = data.get('path')
@@ -2611,8 +3375,8 @@ def github_commit_file(request):
 @require_http_methods(["POST"])
 def github_open_pr(request):
     try:
-        import os, json
-        data = json.loads(request.body or '{}')
+        import os
+        data = _payload(request)
         repo = data.get('repo','')
         head = data.get('head')  # branch name
         base = data.get('base','main')
@@ -2789,7 +3553,7 @@ def fudbal_odds_changes(request):
 def fudbal_competition(request):
     """Return competition fixtures/odds filtered to next 82 hours.
     Query params:
-      - key: one of [ucl, laliga, epl, bundesliga, seriea, ligue1, serbia]
+      - key: one of [ucl, laliga, epl, bundesliga, seriea, ligue1, serbia], or 'all' for every competition
       - url: full competition URL (overrides key)
     """
     try:
@@ -2799,10 +3563,11 @@ def fudbal_competition(request):
         target = url or key or 'ucl'
         hours = request.GET.get('hours')
         all_flag = request.GET.get('all')
-        debug_flag = request.GET.get('debug')
         hours_val = None if (all_flag and all_flag in ['1', 'true', 'yes']) else (int(hours) if hours and hours.isdigit() else fudbal91.WINDOW_HOURS)
-        debug = bool(debug_flag and debug_flag.lower() in ['1', 'true', 'yes'])
-        data = fudbal91.fetch_competition(target, hours=hours_val, debug=debug)
+        if target.lower() == 'all':
+            # Sva takmičenja paralelno – rezultati po ključu
+            return JsonResponse({"source": "fudbal91", "competitions": fudbal91.fetch_all_competitions(hours=hours_val)})
+        data = fudbal91.fetch_competition(target, hours=hours_val)
         return JsonResponse(data)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
@@ -2953,7 +3718,7 @@ def _ensure_daily_lessons_push() -> Dict[str, Any]:
 @require_http_methods(["POST"])
 def update_feedback(request, lesson_id):
     try:
-        feedback = request.POST.get("feedback") or (json.loads(request.body).get('feedback') if request.body else None)
+        feedback = request.POST.get("feedback") or _payload(request).get('feedback')
         if feedback not in ["correct", "incorrect", "pending"]:
             return JsonResponse({"error": "Invalid feedback"}, status=400)
         lesson = LessonLearned.objects.get(id=lesson_id)
@@ -2970,9 +3735,8 @@ def manifest_view(request):
     """Serve manifest.json explicitly as a safety net when static route fails."""
     try:
         # Serve directly from static files directory
-        manifest_path = settings.BASE_DIR / 'static' / 'manifest.json'
-        if manifest_path.exists():
-            return FileResponse(open(manifest_path, 'rb'), content_type='application/manifest+json')
+        if STATIC_MANIFEST_PATH.exists():
+            return FileResponse(open(STATIC_MANIFEST_PATH, 'rb'), content_type='application/manifest+json')
         else:
             # Fallback: create a simple manifest
             simple_manifest = {
@@ -3042,82 +3806,89 @@ def sports_verify(request):
         return JsonResponse(data)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
-@require_http_methods(["GET"])
-def health_view(request):
-    """Health endpoint: proverava statiku (manifest.json), env varijable i DB dostupnost.
-    Nikada ne baca 500 – u slučaju greške vraća JSON sa status='error'.
-    """
+def _compute_health():
+    """Sakuplja stanje statike, env varijabli, baze i AI konekcije za health_view."""
+    import os
+    from django.conf import settings as dj_settings
+    from django.contrib.staticfiles import finders
+    from django.db import connection
+
+    # Provera manifest.json preko staticfiles findera i preko STATIC_ROOT
+    manifest_found = False
+    manifest_path = None
     try:
-        import os
-        from django.conf import settings as dj_settings
-        from django.contrib.staticfiles import finders
-        from .models import Conversation
-
-        # Provera manifest.json preko staticfiles findera i preko STATIC_ROOT
+        manifest_path = finders.find('manifest.json')
+        if not manifest_path:
+            # fallback na filesystem
+            if MANIFEST_CANDIDATE and os.path.exists(MANIFEST_CANDIDATE):
+                manifest_path = MANIFEST_CANDIDATE
+        manifest_found = bool(manifest_path)
+    except Exception:
         manifest_found = False
-        manifest_path = None
-        try:
-            manifest_path = finders.find('manifest.json')
-            if not manifest_path:
-                # fallback na filesystem
-                candidate = (dj_settings.STATIC_ROOT / 'manifest.json') if isinstance(dj_settings.STATIC_ROOT, Path) else os.path.join(dj_settings.STATIC_ROOT, 'manifest.json')
-                if os.path.exists(candidate):
-                    manifest_path = str(candidate)
-            manifest_found = bool(manifest_path)
-        except Exception:
-            manifest_found = False
 
-        # Provera env varijabli
-        env_info = {
-            'DEEPSEEK_API_KEY': bool(dj_settings.DEEPSEEK_API_KEY),
-            'SERPAPI_API_KEY': bool(os.getenv('SERPAPI_API_KEY')),
-            'DEBUG': bool(dj_settings.DEBUG),
-        }
+    # Provera env varijabli
+    env_info = {
+        'DEEPSEEK_API_KEY': bool(dj_settings.DEEPSEEK_API_KEY),
+        'SERPAPI_API_KEY': bool(os.getenv('SERPAPI_API_KEY')),
+        'DEBUG': bool(dj_settings.DEBUG),
+    }
 
-        # Provera DB konekcije
-        db_ok = True
-        db_error = None
-        try:
-            _ = Conversation.objects.count()
-        except Exception as e:
-            db_ok = False
-            db_error = str(e)
+    # Provera DB konekcije (SELECT 1 umesto COUNT(*) nad celom tabelom)
+    db_ok = True
+    db_error = None
+    try:
+        with connection.cursor() as c:
+            c.execute('SELECT 1')
+            c.fetchone()
+    except Exception as e:
+        db_ok = False
+        db_error = str(e)
 
-        # Provera AI konekcije (bez otkrivanja ključa)
-        ai_ok = False
-        ai_status_code = None
-        ai_error = None
-        try:
-            api_key = os.getenv('DEEPSEEK_API_KEY', '')
-            api_url = os.getenv('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1/chat/completions')
-            model_name = os.getenv('DEEPSEEK_MODEL', 'deepseek-chat') or 'deepseek-chat'
-            if api_key:
-                headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", "Accept": "application/json"}
-                payload = {"model": model_name, "messages": [{"role": "user", "content": "ping"}], "max_tokens": 1}
-                import requests
-                r = requests.post(api_url, headers=headers, json=payload, timeout=5)
-                if r.status_code == 401:
-                    # Retry with alternate header schema
-                    alt_headers = {"X-API-Key": api_key, "Content-Type": "application/json", "Accept": "application/json"}
-                    r = requests.post(api_url, headers=alt_headers, json=payload, timeout=5)
-                ai_status_code = r.status_code
-                ai_ok = r.ok
-            else:
-                ai_error = 'no_api_key'
-        except Exception as e:
-            ai_error = str(e)
+    # Provera AI konekcije (bez otkrivanja ključa)
+    ai_ok = False
+    ai_status_code = None
+    ai_error = None
+    try:
+        api_key = os.getenv('DEEPSEEK_API_KEY', '')
+        api_url = os.getenv('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1/chat/completions')
+        model_name = os.getenv('DEEPSEEK_MODEL', 'deepseek-chat') or 'deepseek-chat'
+        if api_key:
+            headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json", "Accept": "application/json"}
+            payload = {"model": model_name, "messages": [{"role": "user", "content": "ping"}], "max_tokens": 1}
+            import requests
+            r = requests.post(api_url, headers=headers, json=payload, timeout=5)
+            if r.status_code == 401:
+                # Retry with alternate header schema
+                alt_headers = {"X-API-Key": api_key, "Content-Type": "application/json", "Accept": "application/json"}
+                r = requests.post(api_url, headers=alt_headers, json=payload, timeout=5)
+            ai_status_code = r.status_code
+            ai_ok = r.ok
+        else:
+            ai_error = 'no_api_key'
+    except Exception as e:
+        ai_error = str(e)
+
+    return {
+        'status': 'ok' if (manifest_found and db_ok) else 'degraded',
+        'static_manifest_found': manifest_found,
+        'static_manifest_path': manifest_path,
+        'env': env_info,
+        'db_ok': db_ok,
+        'db_error': db_error,
+        'ai_ok': ai_ok,
+        'ai_status_code': ai_status_code,
+        'ai_error': ai_error,
+    }
 
-        return JsonResponse({
-            'status': 'ok' if (manifest_found and db_ok) else 'degraded',
-            'static_manifest_found': manifest_found,
-            'static_manifest_path': manifest_path,
-            'env': env_info,
-            'db_ok': db_ok,
-            'db_error': db_error,
-            'ai_ok': ai_ok,
-            'ai_status_code': ai_status_code,
-            'ai_error': ai_error,
-        })
+@require_http_methods(["GET"])
+def health_view(request):
+    """Health endpoint: proverava statiku (manifest.json), env varijable i DB dostupnost.
+    Nikada ne baca 500 – u slučaju greške vraća JSON sa status='error'.
+    Rezultat se kešira 5s da niz health probe-ova ne bi opteretio bazu i AI API.
+    """
+    try:
+        from django.core.cache import cache
+        return JsonResponse(cache.get_or_set('nesako_health', _compute_health, 5))
     except Exception as e:
         return JsonResponse({'status': 'error', 'error': str(e)}, status=200)
 
@@ -3227,7 +3998,7 @@ def git_sync_view(request):
         if not request.session.get('authenticated'):
             return JsonResponse({'error': 'Neautorizovan pristup'}, status=401)
         
-        data = json.loads(request.body)
+        data = _json_loads(request.body)
         operation = data.get('operation', 'status')
         
         # Apsolutna putanja do projekta
@@ -3286,284 +4057,27 @@ def git_sync_view(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
     
-    def get_task_progress(self, task_id):
-        """Track progress of long-running tasks with heavy task processor integration"""
-        import time
-        current_time = time.time()
+    def is_heavy_task(self, user_input: str, input_lower: Optional[str] = None) -> bool:
+        """Detektuje da li je task heavy i treba background processing"""
+        return _HEAVY_TASK_RE.search(input_lower if input_lower is not None else user_input.lower()) is not None
+    
+    def detect_critical_threats(self, user_input):
+        """Detect only CRITICAL security threats - reduced false positives"""
+        critical_threats = []
         
-        # Check if it's a heavy task
-        if task_id and task_id.startswith('heavy_'):
-            try:
-                heavy_task_status = task_processor.get_task_status(task_id)
-                
-                if heavy_task_status['status'] == 'not_found':
-                    return {'status': 'not_found', 'progress': 0}
-                
-                status_mapping = {
-                    'pending': 'running',
-                    'running': 'running', 
-                    'completed': 'completed',
-                    'failed': 'failed',
-                    'cancelled': 'cancelled',
-                    'retrying': 'running'
-                }
-                
-                mapped_status = status_mapping.get(heavy_task_status['status'], 'running')
-                
-                if mapped_status == 'completed':
-                    result_text = f"✅ **HEAVY TASK ZAVRŠEN**\n\n"
-                    result_text += f"Task ID: `{task_id}`\n"
-                    result_text += f"Status: Uspešno završen\n"
-                    result_text += f"Trajanje: {self.calculate_task_duration(heavy_task_status)}\n\n"
-                    
-                    if heavy_task_status.get('result'):
-                        result_text += f"**REZULTAT:**\n{self.format_heavy_task_result(heavy_task_status['result'])}"
-                    
-                    return {
-                        'status': 'completed',
-                        'progress': 100,
-                        'result': result_text
-                    }
-                
-                elif mapped_status == 'failed':
-                    error_text = f"❌ **HEAVY TASK NEUSPEŠAN**\n\n"
-                    error_text += f"Task ID: `{task_id}`\n"
-                    error_text += f"Greška: {heavy_task_status.get('error', 'Nepoznata greška')}\n"
-                    error_text += f"Pokušaji: {heavy_task_status.get('retry_count', 0)}\n"
-                    
-                    return {
-                        'status': 'failed',
-                        'progress': 0,
-                        'result': error_text
-                    }
-                
-                else:
-                    return {
-                        'status': 'running',
-                        'progress': heavy_task_status.get('progress', 50)
-                    }
-            except Exception as e:
-                # Fallback for task processor errors
-                return {
-                    'status': 'running',
-                    'progress': 50,
-                    'result': None
-                }
-        
-        # Legacy task handling
-        try:
-            # Parse task_id to get timestamp
-            task_timestamp = None
-            if task_id and task_id.startswith('task_'):
-                # Remove 'task_' prefix
-                id_part = task_id[5:]
-                
-                if '_' in id_part:
-                    parts = id_part.split('_')
-                    timestamp_str = parts[0]
-                else:
-                    timestamp_str = id_part
-                
-                # Convert timestamp
-                if len(timestamp_str) > 10:
-                    task_timestamp = int(timestamp_str) / 1000.0
-                else:
-                    task_timestamp = int(timestamp_str)
-            
-            if task_timestamp is None:
-                return {
-                    'status': 'not_found',
-                    'progress': 0,
-                    'result': None
-                }
-            
-            # Calculate elapsed time
-            elapsed = current_time - task_timestamp
-            
-            # Progress calculation over 15 seconds
-            duration = 15.0
-            if elapsed < 0:
-                elapsed = 0
-            
-            if elapsed < duration:
-                progress = int((elapsed / duration) * 100)
-                progress = max(1, min(99, progress))
-                
-                return {
-                    'status': 'running',
-                    'progress': progress,
-                    'result': None
-                }
-            else:
-                return {
-                    'status': 'completed',
-                    'progress': 100,
-                    'result': 'Zadatak uspešno završen!'
-                }
-                
-        except Exception as e:
-            # Fallback: return incremental progress based on current time
-            fallback_progress = int((current_time % 15) * 6.67)
-            fallback_progress = max(1, min(95, fallback_progress))
-            
-            return {
-                'status': 'running',
-                'progress': fallback_progress,
-                'result': None
-            }
-    
-    def is_heavy_task(self, user_input: str) -> bool:
-        """Detektuje da li je task heavy i treba background processing"""
-        heavy_keywords = [
-            'analiziraj kod', 'code analysis', 'optimize code', 'deep analysis',
-            'procesiraj fajl', 'process file', 'analyze file', 'large file',
-            'train model', 'machine learning', 'ai training', 'data processing',
-            'heavy computation', 'complex analysis', 'batch processing'
-        ]
-        
-        input_lower = user_input.lower()
-        return any(keyword in input_lower for keyword in heavy_keywords)
-    
-    def extract_code_from_input(self, user_input: str) -> str:
-        """Izvlači kod iz korisničkog unosa"""
-        # Traži kod između ``` blokova
-        import re
-        code_blocks = re.findall(r'```(?:\w+)?\n(.*?)\n```', user_input, re.DOTALL)
-        if code_blocks:
-            return code_blocks[0]
-        
-        # Fallback - uzmi ceo input ako nema code blokova
-        return user_input
-    
-    def detect_programming_language(self, code: str) -> str:
-        """Detektuje programski jezik na osnovu koda"""
-        code_lower = code.lower()
-        
-        if any(keyword in code_lower for keyword in ['def ', 'import ', 'print(', 'if __name__']):
-            return 'python'
-        elif any(keyword in code_lower for keyword in ['function', 'const ', 'let ', 'var ', 'console.log']):
-            return 'javascript'
-        elif any(keyword in code_lower for keyword in ['public class', 'public static void', 'System.out']):
-            return 'java'
-        elif any(keyword in code_lower for keyword in ['#include', 'int main', 'printf', 'cout']):
-            return 'c++'
-        elif any(keyword in code_lower for keyword in ['SELECT', 'FROM', 'WHERE', 'INSERT']):
-            return 'sql'
-        else:
-            return 'text'
-    
-    def extract_file_path_from_input(self, user_input: str) -> str:
-        """Izvlači putanju fajla iz unosa"""
-        import re
-        
-        # Traži putanje u navodnicima
-        path_pattern = r'"([^"]+\.[a-zA-Z0-9]+)"'
-        matches = re.findall(path_pattern, user_input)
-        if matches:
-            return matches[0]
-        
-        # Traži Windows putanje
-        windows_pattern = r'[A-Za-z]:\\[^\\/:*?"<>|\r\n]+\.[a-zA-Z0-9]+'
-        matches = re.findall(windows_pattern, user_input)
-        if matches:
-            return matches[0]
-        
-        return "unknown_file.txt"
-    
-    def extract_operation_from_input(self, user_input: str) -> str:
-        """Izvlači tip operacije iz unosa"""
-        input_lower = user_input.lower()
-        
-        if any(word in input_lower for word in ['analyze', 'analiziraj']):
-            return 'analyze'
-        elif any(word in input_lower for word in ['convert', 'konvertuj']):
-            return 'convert'
-        elif any(word in input_lower for word in ['compress', 'kompresuj']):
-            return 'compress'
-        elif any(word in input_lower for word in ['backup', 'bekap']):
-            return 'backup'
-        else:
-            return 'process'
-    
-    def calculate_task_duration(self, task_status: Dict) -> str:
-        """Računa trajanje task-a"""
-        if not task_status.get('started_at') or not task_status.get('completed_at'):
-            return "N/A"
-        
-        from datetime import datetime
-        try:
-            started = datetime.fromisoformat(task_status['started_at'])
-            completed = datetime.fromisoformat(task_status['completed_at'])
-            duration = completed - started
-            
-            total_seconds = int(duration.total_seconds())
-            if total_seconds < 60:
-                return f"{total_seconds} sekundi"
-            elif total_seconds < 3600:
-                minutes = total_seconds // 60
-                return f"{minutes} minuta"
-            else:
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                return f"{hours}h {minutes}m"
-        except:
-            return "N/A"
-    
-    def format_heavy_task_result(self, result: Any) -> str:
-        """Formatira rezultat heavy task-a za prikaz"""
-        if isinstance(result, dict):
-            formatted = ""
-            for key, value in result.items():
-                formatted += f"- **{key}**: {value}\n"
-            return formatted
-        elif isinstance(result, list):
-            return "\n".join([f"- {item}" for item in result])
-        else:
-            return str(result)
-    
-    def detect_critical_threats(self, user_input):
-        """Detect only CRITICAL security threats - reduced false positives"""
-        critical_threats = []
-        
-        # Only truly dangerous patterns
-        critical_patterns = [
-            r'rm\s+-rf\s+/\s*$',  # Root deletion
-            r'format\s+c:',       # Format C drive
-            r'del\s+/s\s+/q\s+c:\\',  # Delete C drive
-            r'DROP\s+DATABASE\s+\*',  # Drop all databases
-        ]
-        
-        for pattern in critical_patterns:
-            if re.search(pattern, user_input, re.IGNORECASE):
-                critical_threats.append(f"KRITIČNA PRETNJA: {pattern}")
+        # Only truly dangerous patterns (_CRITICAL_REGEXES), sa jeftinim pre-screen-om
+        low = user_input.lower()
+        for token, regex in _CRITICAL_REGEXES:
+            if token not in low:
+                continue
+            if regex.search(user_input):
+                critical_threats.append(f"KRITIČNA PRETNJA: {regex.pattern}")
         
         return "\n".join(critical_threats) if critical_threats else None
 
     def check_rate_limit(self, session_id, max_requests=5, time_window=60):
         """Check if user has exceeded rate limit"""
-        import time
-        current_time = time.time()
-        
-        if not hasattr(self, '_rate_limit_data'):
-            self._rate_limit_data = {}
-        
-        # Clean up old entries
-        for key in list(self._rate_limit_data.keys()):
-            if current_time - self._rate_limit_data[key]['timestamp'] > time_window:
-                del self._rate_limit_data[key]
-        
-        if session_id not in self._rate_limit_data:
-            self._rate_limit_data[session_id] = {
-                'count': 1,
-                'timestamp': current_time
-            }
-            return True
-        
-        if self._rate_limit_data[session_id]['count'] >= max_requests:
-            return False
-        
-        self._rate_limit_data[session_id]['count'] += 1
-        return True
+        return _sliding_window_allow(session_id, max_requests, time_window)
     
     def analyze_and_learn_patterns(self, conversation_history):
         """Advanced learning system that remembers and adapts"""
@@ -3583,26 +4097,16 @@ def git_sync_view(request):
         # Analyze all conversation history for deep learning
         for msg in conversation_history:
             content = msg.get('content', '').lower()
+            tokens = set(_LEARN_TOKEN_RE.findall(content))
             
-            # Detect programming languages
-            languages = ['python', 'javascript', 'typescript', 'java', 'c++', 'html', 'css', 'sql', 'react', 'vue', 'angular']
-            for lang in languages:
-                if lang in content:
-                    learning_profile['programming_languages'].add(lang)
-            
-            # Detect frameworks
-            frameworks = ['django', 'flask', 'fastapi', 'express', 'react', 'vue', 'angular', 'bootstrap']
-            for fw in frameworks:
-                if fw in content:
-                    learning_profile['preferred_frameworks'].add(fw)
+            # Detect programming languages and frameworks (presek tokena sa skupovima)
+            learning_profile['programming_languages'] |= tokens & _LEARN_LANGS
+            learning_profile['preferred_frameworks'] |= tokens & _LEARN_FRAMEWORKS
             
             # Detect project types
-            if any(word in content for word in ['web app', 'aplikacija', 'website']):
-                learning_profile['project_types'].add('web_development')
-            if any(word in content for word in ['api', 'rest', 'microservice']):
-                learning_profile['project_types'].add('api_development')
-            if any(word in content for word in ['analiza', 'data', 'statistik']):
-                learning_profile['project_types'].add('data_analysis')
+            for project_type, words in _LEARN_PROJECT_TYPES:
+                if any(word in content for word in words):
+                    learning_profile['project_types'].add(project_type)
         
         # Generate learned context
         context_parts = []
@@ -3632,34 +4136,12 @@ def git_sync_view(request):
             content = user_input.lower()
             
             # Programski jezici
-            lang_patterns = {
-                'python': ['python', 'django', 'flask', 'fastapi', '.py'],
-                'javascript': ['javascript', 'js', 'node', 'react', 'vue', 'angular'],
-                'typescript': ['typescript', 'ts'],
-                'java': ['java', 'spring'],
-                'csharp': ['c#', 'csharp', '.net', 'asp.net'],
-                'php': ['php', 'laravel', 'symfony'],
-                'go': ['golang', 'go'],
-                'rust': ['rust'],
-                'cpp': ['c++', 'cpp']
-            }
-            
-            for lang, patterns in lang_patterns.items():
+            for lang, patterns in _LEARN_LANG_PATTERNS.items():
                 if any(pattern in content for pattern in patterns):
                     languages.append(lang)
             
             # Framework-ovi
-            fw_patterns = {
-                'django': ['django'],
-                'react': ['react', 'reactjs'],
-                'vue': ['vue', 'vuejs'],
-                'angular': ['angular'],
-                'express': ['express', 'expressjs'],
-                'flask': ['flask'],
-                'fastapi': ['fastapi']
-            }
-            
-            for fw, patterns in fw_patterns.items():
+            for fw, patterns in _LEARN_FW_PATTERNS.items():
                 if any(pattern in content for pattern in patterns):
                     frameworks.append(fw)
             
@@ -3690,91 +4172,9 @@ def git_sync_view(request):
         except Exception as e:
             print(f"Error updating learning: {e}")
     
-    def create_and_execute_plan(self, user_input, user_context):
-        """Create comprehensive execution plan with best practices"""
-        task_type = self.identify_advanced_task_type(user_input)
-        
-        advanced_plans = {
-            'web_app': """🚀 NAPREDNI WEB APP PLAN:
-1. 📋 Arhitekturna analiza i tehnološki stack
-2. 🏗️ Kreiranje scalable strukture sa microservices
-3. 🎨 Modern UI/UX sa responsive design
-4. ⚙️ Backend sa REST API i GraphQL
-5. 🔗 Frontend-backend integracija sa state management
-6. 🧪 Comprehensive testing (unit, integration, e2e)
-7. 🛡️ Security implementation (auth, CORS, validation)
-8. 🚀 CI/CD pipeline i production deployment
-9. 📊 Monitoring, logging i analytics
-10. 📚 Kompletna dokumentacija i API specs""",
-            'api': """🚀 ENTERPRISE API PLAN:
-1. 📋 OpenAPI 3.0 specifikacija
-2. 🏗️ Microservices arhitektura
-3. 🔧 RESTful endpoints sa GraphQL
-4. 🛡️ JWT authentication i rate limiting
-5. 📊 Database design sa optimizacijom
-6. 🧪 Automated testing suite
-7. 📖 Interactive API dokumentacija
-8. 🚀 Docker containerization i K8s deployment
-9. 📈 Performance monitoring i caching
-10. 🔄 Versioning i backward compatibility""",
-            'data_analysis': """🚀 NAPREDNA DATA ANALIZA:
-1. 📊 Data pipeline arhitektura
-2. 🧹 ETL procesi sa data validation
-3. 📈 Eksplorativna analiza sa vizualizacijama
-4. 🤖 Machine learning modeli
-5. 📋 Interactive dashboards
-6. 📝 Automated reporting
-7. 📊 Real-time analytics
-8. 🚀 Cloud deployment (AWS/GCP/Azure)
-9. 🔄 Model monitoring i retraining
-10. 📚 Kompletna dokumentacija i insights""",
-            'mobile_app': """🚀 MOBILNA APLIKACIJA PLAN:
-1. 📋 Definicija funkcionalnosti i dizajna
-2. 🏗️ Kreiranje mobilne aplikacije sa React Native ili Flutter
-3. 🎨 UI/UX dizajn sa korisničkim iskustvom
-4. 🔗 Integracija sa backend servisima
-5. 🧪 Testiranje aplikacije
-6. 📈 Optimizacija performansi
-7. 📊 Analitika i monitoring
-8. 📚 Dokumentacija i podrška""",
-            'desktop_app': """🚀 DESKTOP APLIKACIJA PLAN:
-1. 📋 Definicija funkcionalnosti i dizajna
-2. 🏗️ Kreiranje desktop aplikacije sa Electron ili Qt
-3. 🎨 UI/UX dizajn sa korisničkim iskustvom
-4. 🔗 Integracija sa backend servisima
-5. 🧪 Testiranje aplikacije
-6. 📈 Optimizacija performansi
-7. 📊 Analitika i monitoring
-8. 📚 Dokumentacija i podrška"""
-        }
-        
-        return advanced_plans.get(task_type, advanced_plans['web_app'])
-    
-    def identify_advanced_task_type(self, user_input):
-        """Advanced task type identification"""
-        input_lower = user_input.lower()
-        
-        # More sophisticated pattern matching
-        if any(word in input_lower for word in ['api', 'rest', 'graphql', 'microservice', 'endpoint']):
-            return 'api'
-        elif any(word in input_lower for word in ['analiza', 'podatak', 'data', 'statistik', 'ml', 'ai']):
-            return 'data_analysis'
-        elif any(word in input_lower for word in ['mobile', 'android', 'ios', 'react native']):
-            return 'mobile_app'
-        elif any(word in input_lower for word in ['desktop', 'electron', 'tkinter', 'qt']):
-            return 'desktop_app'
-        else:
-            return 'web_app'
-    
-    def is_complex_task(self, user_input):
+    def is_complex_task(self, user_input, input_lower=None):
         """Check if task is complex and requires planning"""
-        complex_keywords = [
-            'kreiraj', 'napravi', 'build', 'create', 'develop', 'implementiraj',
-            'aplikacija', 'app', 'website', 'web', 'sistem', 'database',
-            'api', 'backend', 'frontend', 'full stack', 'projekt'
-        ]
-        
-        return any(keyword in user_input.lower() for keyword in complex_keywords)
+        return _COMPLEX_TASK_RE.search(input_lower if input_lower is not None else user_input.lower()) is not None
     
     def advanced_rollback(self, repo_url, commits_back=2, force=False):
         """Advanced rollback system without sandbox limitations"""
@@ -3903,280 +4303,6 @@ Da li želite da nastavite? (potrebna je eksplicitna potvrda)"""
         
         return "\n".join(explanations)
 
-    def generate_fallback_image_response(self, processed_images, user_instruction):
-        """Generate fallback response when AI API is unavailable"""
-        response_parts = []
-        
-        response_parts.append("📸 **ANALIZA SLIKA (FALLBACK MODE)**")
-        response_parts.append("")
-        response_parts.append("AI servis je trenutno nedostupan, ali evo osnovne analize:")
-        response_parts.append("")
-        
-        for img in processed_images:
-            response_parts.append(f"**{img['filename']}:**")
-            response_parts.append(f"  • Format: {img['info'].get('format', 'Nepoznato')}")
-            response_parts.append(f"  • Dimenzije: {img['info'].get('width', 0)}x{img['info'].get('height', 0)}")
-            response_parts.append(f"  • Veličina: {img['info'].get('size_kb', 0)} KB")
-            
-            if 'color_mode' in img['info']:
-                response_parts.append(f"  • Boje: {img['info']['color_mode']}")
-            
-            if 'analysis' in img and 'estimated_type' in img['analysis']:
-                response_parts.append(f"  • Tip: {img['analysis']['estimated_type']}")
-            
-            response_parts.append("")
-        
-        if user_instruction:
-            response_parts.append(f"**Vaš zahtev:** {user_instruction}")
-            response_parts.append("")
-            response_parts.append("ℹ️ *Za detaljniju analizu, molim pokušajte ponovo kada AI servis bude dostupan*")
-        else:
-            response_parts.append("ℹ️ *Za detaljnu AI analizu, molim pokušajte ponovo kasnije*")
-        
-        return "\n".join(response_parts)
-
-    def reformulate_search_query(self, original_query, conversation_history):
-        """Reformulate search query using AI for better results"""
-        # If we have conversation history, use it to add context
-        context = ""
-        if conversation_history:
-            # Get last few user messages for context
-            recent_messages = []
-            for msg in reversed(conversation_history[-6:]):  # Last 6 messages
-                if msg.get('isUser'):
-                    content = msg.get('content', '')
-                    if content and content != original_query:
-                        recent_messages.append(content)
-                if len(recent_messages) >= 3:  # Max 3 context messages
-                    break
-            
-            if recent_messages:
-                context = " Kontekst razgovora: " + ". ".join(reversed(recent_messages))
-        
-        # Simple reformulation - in a real implementation, you'd use an AI API
-        # For now, we'll do some basic improvements
-        query = original_query.lower()
-        
-        # Remove common filler words
-        filler_words = {'molim', 'te', 'da', 'mi', 'kažeš', 'pomozi', 'sa', 'o'}
-        words = query.split()
-        filtered_words = [word for word in words if word not in filler_words and len(word) > 2]
-        
-        # Add context if available
-        if context:
-            reformulated = ' '.join(filtered_words) + context
-        else:
-            reformulated = ' '.join(filtered_words)
-        
-        # Ensure the query isn't too long
-        if len(reformulated) > 100:
-            reformulated = reformulated[:97] + '...'
-        
-        return reformulated if reformulated.strip() else original_query
-    
-    def handle_image_upload(self, request):
-        """Obrađuje upload slika"""
-        try:
-            print("=== IMAGE UPLOAD DETECTED ===")
-            
-            # Get uploaded files
-            uploaded_files = request.FILES.getlist('images')
-            if not uploaded_files:
-                return JsonResponse({
-                    'error': 'Nema upload-ovanih slika',
-                    'status': 'error',
-                    'response': 'Molim upload-ujte sliku za analizu.'
-                }, status=400)
-            
-            # Get text instruction if provided
-            user_instruction = request.POST.get('instruction', '').strip()
-            
-            # Process each image
-            processed_images = []
-            image_descriptions = []
-            
-            for uploaded_file in uploaded_files[:3]:  # Limit to 3 images
-                print(f"Processing image: {uploaded_file.name}")
-                
-                # Read image data
-                image_data = uploaded_file.read()
-                
-                # Process image
-                result = self.image_processor.process_uploaded_image(image_data, uploaded_file.name)
-                
-                if result['success']:
-                    processed_images.append({
-                        'filename': uploaded_file.name,
-                        'info': result['image_info'],
-                        'analysis': result['analysis'],
-                        'base64': result['image_base64'][:1000] + '...' if len(result['image_base64']) > 1000 else result['image_base64']  # Truncate for response
-                    })
-                    
-                    # Generate description
-                    description = self.image_processor.generate_image_description(
-                        result['analysis'], 
-                        result['image_info']
-                    )
-                    image_descriptions.append(f"📸 {uploaded_file.name}: {description}")
-                else:
-                    return JsonResponse({
-                        'error': result['error'],
-                        'status': 'error',
-                        'response': f'Greška pri obradi slike {uploaded_file.name}: {result["error"]}'
-                    }, status=400)
-            
-            # Create AI prompt with image analysis
-            image_context = "\n".join(image_descriptions)
-            
-            if user_instruction:
-                combined_prompt = f"""ANALIZA SLIKA:
-{image_context}
-
-KORISNIKOV ZAHTEV:
-{user_instruction}
-
-Molim analiziraj upload-ovane slike i odgovori na korisnikov zahtev. Koristi detalje iz analize slika da daš precizan i koristan odgovor."""
-            else:
-                combined_prompt = f"""ANALIZA UPLOAD-OVANIH SLIKA:
-{image_context}
-
-Molim analiziraj ove slike i daj detaljnu analizu sa preporukama za poboljšanje ili dalju obradu."""
-            
-            # Get session ID for memory
-            session_id = request.session.session_key
-            if not session_id:
-                request.session.save()
-                session_id = request.session.session_key
-            
-            # Save to memory
-            self.memory.save_conversation(
-                session_id=session_id,
-                user_message=f"Upload slika: {', '.join([f.name for f in uploaded_files])} - {user_instruction}",
-                ai_response="Obrađujem upload-ovane slike...",
-                tools_used=['image_processing'],
-                context_data={'images_processed': len(processed_images)}
-            )
-            
-            # Call DeepSeek API with image analysis
-            API_URL = "https://api.deepseek.com/v1/chat/completions"
-            API_KEY = os.environ.get('DEEPSEEK_API_KEY')
-            
-            if not API_KEY:
-                return JsonResponse({
-                    'error': 'DeepSeek API key nije konfigurisan',
-                    'status': 'error'
-                }, status=500)
-            
-            headers = {
-                "Authorization": f"Bearer {API_KEY}",
-                "Content-Type": "application/json"
-            }
-            
-            # Get current time
-            belgrade_tz = pytz.timezone('Europe/Belgrade')
-            current_time = datetime.now(belgrade_tz)
-            current_time_str = current_time.strftime("%H:%M")
-            current_date = current_time.strftime("%d.%m.%Y")
-            day_of_week = current_time.strftime("%A")
-            
-            days_serbian = {
-                'Monday': 'ponedeljak', 'Tuesday': 'utorak', 'Wednesday': 'sreda',
-                'Thursday': 'četvrtak', 'Friday': 'petak', 'Saturday': 'subota', 'Sunday': 'nedelja'
-            }
-            day_serbian = days_serbian.get(day_of_week, day_of_week)
-            
-            system_message = f"""Ti si NESAKO AI - napredni asistent za analizu slika i vizuelni sadržaj.
-
-TRENUTNO VREME: {current_time_str}, {day_serbian}, {current_date}
-
-SPECIJALIZACIJA ZA SLIKE:
-🖼️ Detaljno analiziram sve aspekte slika (kompozicija, boje, kvalitet, sadržaj)
-🔍 Prepoznajem objekte, tekst, ljude, arhitekturu, prirodu
-🎨 Dajem savete za poboljšanje fotografija i dizajna
-💡 Predlažem kreativne ideje i izmene
-🛠️ Objašnjavam tehničke aspekte (osvetljenje, kontrast, rezolucija)
-📊 Poredim više slika i dajem komparativnu analizu
-
-INSTRUKCIJE:
-- Analiziraj svaku sliku detaljno i precizno
-- Koristi srpski jezik za sve odgovore
-- Daj praktične savete i preporuke
-- Budi kreativan i koristan
-- Fokusiraj se na ono što korisnik pita
-
-Odgovori direktno i korisno na osnovu analize slika."""
-
-            payload = {
-                'model': 'deepseek-chat',
-                'messages': [
-                    {'role': 'system', 'content': system_message},
-                    {'role': 'user', 'content': combined_prompt}
-                ],
-                'temperature': 0.4,
-                'max_tokens': 3000,
-                'stream': False
-            }
-            
-            try:
-                response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    ai_response = result['choices'][0]['message']['content']
-                    
-                    # Update memory with final response
-                    self.memory.save_conversation(
-                        session_id=session_id,
-                        user_message=f"Upload slika: {', '.join([f.name for f in uploaded_files])} - {user_instruction}",
-                        ai_response=ai_response,
-                        tools_used=['image_processing', 'ai_analysis'],
-                        context_data={
-                            'images_processed': len(processed_images),
-                            'image_details': [img['info'] for img in processed_images]
-                        }
-                    )
-                    
-                    return JsonResponse({
-                        'response': ai_response,
-                        'status': 'success',
-                        'timestamp': current_time.isoformat(),
-                        'mode': 'image_analysis',
-                        'images_processed': len(processed_images),
-                        'image_data': processed_images,
-                        'tools_used': True
-                    })
-                else:
-                    # Fallback response when API fails
-                    fallback_response = self.generate_fallback_image_response(processed_images, user_instruction)
-                    
-                    return JsonResponse({
-                        'response': fallback_response,
-                        'status': 'success',
-                        'timestamp': current_time.isoformat(),
-                        'mode': 'image_analysis_fallback',
-                        'images_processed': len(processed_images),
-                        'image_data': processed_images,
-                        'tools_used': True,
-                        'note': 'Fallback response used due to API error'
-                    })
-                    
-            except Exception as e:
-                print(f"Image upload error: {e}")
-                return JsonResponse({
-                    'error': f'Greška pri upload-u: {str(e)}',
-                    'status': 'error',
-                    'response': 'Greška pri obradi upload-ovanih slika.'
-                }, status=500)
-
-        except Exception as e:
-            # Catch-all for outer try block
-            print(f"Image upload outer error: {e}")
-            return JsonResponse({
-                'error': f'Neočekivana greška pri obradi slika: {str(e)}',
-                'status': 'error',
-                'response': 'Došlo je do neočekivane greške pri obradi upload-ovanih slika.'
-            }, status=500)
-
 
 class LoginView(View):
     """Simple authentication for private access"""
@@ -4199,7 +4325,7 @@ class LoginView(View):
             wants_json = is_json or hdr_xrw == 'xmlhttprequest' or 'application/json' in hdr_accept
             if request.content_type and 'application/json' in request.content_type:
                 try:
-                    data = json.loads(request.body or '{}')
+                    data = _payload(request)
                 except Exception:
                     data = {}
                 username = str(data.get('username', '')).strip()
@@ -4208,7 +4334,10 @@ class LoginView(View):
                 username = str(request.POST.get('username', '')).strip()
                 password = str(request.POST.get('password', '')).strip()
 
-            if username == 'nesako' and password == 'nesako2024':
+            # Konstantno vreme poređenja; bez short-circuit-a da se ne otkriva koje polje je pogrešno
+            user_ok = hmac.compare_digest(username.encode(), settings.NESAKO_USERNAME.encode())
+            pass_ok = hmac.compare_digest(password.encode(), settings.NESAKO_PASSWORD.encode())
+            if user_ok & pass_ok:
                 request.session['authenticated'] = True
                 if wants_json:
                     return JsonResponse({'success': True, 'redirect': '/'})
@@ -4259,7 +4388,7 @@ def preferences_view(request):
         enabled = None
         if request.content_type and 'application/json' in request.content_type:
             try:
-                data = json.loads(request.body or '{}')
+                data = _payload(request)
                 enabled = data.get('auto_modules_enabled', None)
             except Exception:
                 enabled = None
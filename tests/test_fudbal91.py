@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("bs4")
+pytest.importorskip("soupsieve")
+
+from ai_assistant import fudbal91  # noqa: E402
+
+
+class _FakeResponse:
+    def __init__(self, status_code=200, text="<html><body><p>ok</p></body></html>", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class _FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append((url, dict(headers or {})))
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    session = _FakeSession(_FakeResponse(headers={"ETag": '"v1"'}))
+    monkeypatch.setattr(fudbal91, "_get_session", lambda: session)
+    monkeypatch.setattr(fudbal91, "_HTTP_CACHE", OrderedDict())
+    monkeypatch.setattr(fudbal91, "FUDBAL91_CACHE_MODE", "disabled")
+    monkeypatch.setattr(fudbal91._BUCKET, "acquire", lambda: True)
+    return session
+
+
+def test_get_soup_serves_fresh_pages_from_cache(fake_session):
+    url = "https://www.fudbal91.com/quick_odds"
+
+    first = fudbal91._get_soup(url)
+    second = fudbal91._get_soup(url)
+
+    assert first is second
+    assert len(fake_session.calls) == 1
+
+
+def test_get_soup_nocache_skips_ttl_hit_but_revalidates(fake_session):
+    url = "https://www.fudbal91.com/quick_odds"
+    fudbal91._get_soup(url)
+
+    fudbal91._get_soup(url, nocache=True)
+
+    assert len(fake_session.calls) == 2
+    # Sačuvani ETag ide uz proveru – 304 i dalje vraća keširanu stranicu
+    assert fake_session.calls[1][1].get("If-None-Match") == '"v1"'
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces_requests():
+    clock = _FakeClock()
+    bucket = fudbal91._TokenBucket(rate_per_min=60, capacity=2, max_wait=5, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() and bucket.acquire()
+    assert clock.slept == []
+    assert bucket.acquire()
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_token_bucket_refuses_instead_of_waiting_past_max_wait():
+    clock = _FakeClock()
+    bucket = fudbal91._TokenBucket(rate_per_min=6, capacity=1, max_wait=5, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire()
+    # Sledeći token stiže tek za 10s > max_wait – odbija se bez čekanja i bez rezervacije
+    assert bucket.acquire() is False
+    assert clock.slept == []
+    clock.now += 6
+    assert bucket.acquire()
+    assert clock.slept == [pytest.approx(4.0)]
+
+
+@pytest.mark.parametrize("rate, capacity", [(0, 5), (-1, 5), (30, 0)])
+def test_token_bucket_rejects_invalid_config(rate, capacity):
+    with pytest.raises(ValueError):
+        fudbal91._TokenBucket(rate_per_min=rate, capacity=capacity)
+
+
+def test_get_soup_serves_stale_copy_when_rate_limited(fake_session, monkeypatch):
+    url = "https://www.fudbal91.com/quick_odds"
+    first = fudbal91._get_soup(url)
+    monkeypatch.setattr(fudbal91._BUCKET, "acquire", lambda: False)
+
+    assert fudbal91._get_soup(url, nocache=True) is first
+    assert fudbal91._get_soup("https://www.fudbal91.com/odds_changes") is None
+    assert len(fake_session.calls) == 1
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-09-27 19:45", datetime(2025, 9, 27, 19, 45, tzinfo=timezone.utc)),
+    ("27/09/2025 19:45", datetime(2025, 9, 27, 19, 45, tzinfo=timezone.utc)),
+    ("27.09.2025", datetime(2025, 9, 27, tzinfo=timezone.utc)),
+    # ISO ima prednost i kada se dd.mm.yyyy pojavi ranije (i "pojede" godinu ISO datuma)
+    ("12.09.2025-09-27 19:45", datetime(2025, 9, 27, 19, 45, tzinfo=timezone.utc)),
+    # Posle nevalidnog prvog ISO pogotka ne traži se drugi ISO pogodak
+    ("2025-13-01 10:00 2025-09-27 19:45", None),
+    ("2025-13-01 10:00 2025-09-27T19:45Z", datetime(2025, 9, 27, 19, 45, tzinfo=timezone.utc)),
+    ("2025-09-27T19:45Z", datetime(2025, 9, 27, 19, 45, tzinfo=timezone.utc)),
+    ("  Arsenal - Chelsea 27.09.2025 19:45 1.85 3.40  ", datetime(2025, 9, 27, 19, 45, tzinfo=timezone.utc)),
+    # Nevalidan ISO datum prelazi na dd.mm.yyyy obrazac
+    ("2025-02-30 10:00 27.09.2025 19:45", datetime(2025, 9, 27, 19, 45, tzinfo=timezone.utc)),
+    # Nevalidan sat u dd.mm.yyyy odbacuje ceo pogodak
+    ("27.09.2025 25:00", None),
+    # Bez razmaka '.?' uzima prvu cifru sata, pa vreme izostaje
+    ("27.09.202519:45", datetime(2025, 9, 27, tzinfo=timezone.utc)),
+    ("27.09.2025\n19:45", datetime(2025, 9, 27, tzinfo=timezone.utc)),
+    ("Arsenal - Chelsea 1.85 3.40", None),
+    ("27.09.25", None),
+    ("", None),
+    ("bez datuma", None),
+])
+def test_parse_kickoff_examples(text, expected):
+    assert fudbal91._parse_kickoff(text) == expected
+
+
+def test_aggregator_fetches_all_competitions_for_all_key(monkeypatch):
+    from ai_assistant import sports_aggregator
+
+    calls = []
+
+    def fake_competition(key, hours, nocache):
+        calls.append((key, hours, nocache))
+        return {"source": key, "items": [{"match": f"{key} A - B"}]}
+
+    monkeypatch.setattr(fudbal91, "fetch_competition", fake_competition)
+
+    data = sports_aggregator.fetch_fudbal91(None, "all", None, 24, False, True, False)
+
+    assert sorted(calls) == sorted((key, 24, True) for key in fudbal91.COMPETITION_MAP)
+    assert [it["match"] for it in data["items"]] == [f"{key} A - B" for key in fudbal91.COMPETITION_MAP]
+    assert data["source"] == "fudbal91"
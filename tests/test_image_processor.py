@@ -0,0 +1,121 @@
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from ai_assistant import image_processor  # noqa: E402
+
+
+def _png_bytes(size=(64, 48), color=(200, 30, 30)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(image_processor, "_ANALYSIS_CACHE", image_processor.OrderedDict())
+    monkeypatch.setattr(image_processor, "_ANALYSIS_CACHE_BYTES", 0)
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    monkeypatch.setattr(image_processor, "IMAGE_PROCESS_WORKERS", 1)
+    monkeypatch.setattr(image_processor, "_PROCESS_POOL", None)
+    yield
+    pool = image_processor._PROCESS_POOL
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def test_offloaded_processing_round_trips_through_spawn_pool(process_pool):
+    data = _png_bytes()
+    result = image_processor.process_image_offloaded(data, "slika.png")
+
+    pool = image_processor._PROCESS_POOL
+    assert pool is not None
+    assert pool._mp_context.get_start_method() == "spawn"
+    assert result["success"] is True
+    assert result["image_info"]["filename"] == "slika.png"
+    assert result["image_info"]["size"] == (64, 48)
+    assert result["image_base64"] is None
+    assert result["analysis"]["dominant_colors"][0]["percentage"] == 100.0
+    # Isti rezultat kao obrada u niti pozivaoca
+    assert result == image_processor.decode_and_analyze(data, "slika.png")
+
+
+def test_offloaded_processing_reads_file_like_uploads(process_pool):
+    result = image_processor.process_image_offloaded(io.BytesIO(_png_bytes()), "slika.png", encode_base64=True)
+
+    assert result["success"] is True
+    assert result["image_base64"]
+
+
+def test_offloaded_processing_without_pool_runs_locally(monkeypatch):
+    monkeypatch.setattr(image_processor, "IMAGE_PROCESS_WORKERS", 0)
+    monkeypatch.setattr(image_processor, "_PROCESS_POOL", None)
+
+    result = image_processor.process_image_offloaded(_png_bytes(), "slika.png")
+
+    assert result["success"] is True
+    assert image_processor._PROCESS_POOL is None
+
+
+def test_repeated_image_is_served_from_content_cache(monkeypatch):
+    calls = []
+    original = image_processor.ImageProcessor._process_uploaded_image
+
+    def counting(self, *args):
+        calls.append(args[1])
+        return original(self, *args)
+
+    monkeypatch.setattr(image_processor.ImageProcessor, "_process_uploaded_image", counting)
+    processor = image_processor.ImageProcessor()
+    data = _png_bytes()
+
+    first = processor.process_uploaded_image(data, "a.png")
+    second = processor.process_uploaded_image(io.BytesIO(data), "b.png")
+
+    assert calls == ["a.png"]
+    assert second["image_info"]["filename"] == "b.png"
+    assert first["image_info"]["filename"] == "a.png"
+    assert second["analysis"] == first["analysis"]
+    # Ekstenzija je deo ključa – isti bajtovi pod nedozvoljenim imenom se ponovo validiraju
+    assert processor.process_uploaded_image(data, "a.txt")["valid"] is False
+
+
+def test_offloaded_processing_caches_in_parent(process_pool):
+    data = _png_bytes()
+    first = image_processor.process_image_offloaded(data, "slika.png")
+    image_processor._PROCESS_POOL.shutdown(wait=True)
+
+    # Pool je ugašen – drugi poziv mora doći iz keša roditeljskog procesa
+    assert image_processor.process_image_offloaded(data, "druga.png")["analysis"] == first["analysis"]
+
+
+def test_dominant_colors_match_full_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        side, levels = rng.integers(1, 40), rng.integers(1, 256)
+        rgb = rng.integers(0, levels, (side, side, 3)).astype(np.uint8)
+        pixels = rgb.reshape(-1, 3).astype(np.uint32)
+        counts = np.bincount((pixels[:, 0] >> 3 << 10) | (pixels[:, 1] >> 3 << 5) | (pixels[:, 2] >> 3))
+        expected = sorted(np.flatnonzero(counts).tolist(), key=lambda b: -counts[b])[:5]
+
+        top = image_processor.ImageProcessor._dominant_colors_from_rgb(rgb)
+
+        assert [(c["rgb"][0] >> 3 << 10) | (c["rgb"][1] >> 3 << 5) | (c["rgb"][2] >> 3) for c in top] == expected
+
+
+def test_cached_result_is_not_shared_with_callers():
+    processor = image_processor.ImageProcessor()
+    data = _png_bytes()
+
+    first = processor.process_uploaded_image(data, "a.png")
+    first["description"] = "opis"
+    second = processor.process_uploaded_image(data, "a.png")
+    second["description"] = "drugi"
+
+    assert "description" not in processor.process_uploaded_image(data, "a.png")
@@ -0,0 +1,38 @@
+import time
+from datetime import datetime
+
+from ai_assistant.task_processor import HeavyTaskProcessor
+
+
+def _wait_for(processor, task_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = processor.get_task_status(task_id)
+        if info["status"] == status:
+            return info
+        time.sleep(0.01)
+    raise AssertionError(f"{task_id} did not reach {status}: {info}")
+
+
+def test_task_status_exposes_epoch_timestamps():
+    processor = HeavyTaskProcessor(max_workers=1)
+    try:
+        processor.create_task("heavy_test", "test", lambda: {"ok": True})
+        info = _wait_for(processor, "heavy_test", "completed")
+    finally:
+        processor.stop_workers()
+
+    assert info["result"] == {"ok": True}
+    assert info["started_ts"] == datetime.fromisoformat(info["started_at"]).timestamp()
+    assert info["completed_ts"] == datetime.fromisoformat(info["completed_at"]).timestamp()
+    assert info["started_ts"] <= info["completed_ts"]
+
+
+def test_pending_task_has_no_timestamps():
+    processor = HeavyTaskProcessor(max_workers=0)
+    processor.create_task("heavy_pending", "test", lambda: None)
+
+    info = processor.get_task_status("heavy_pending")
+
+    assert info["status"] == "pending"
+    assert info["started_ts"] is None and info["completed_ts"] is None